@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Python client stack in visualization/tui.
+
+Covers strategy generation, receive-path framing and parsing, send-path
+encoding, the Python reference order books and, when a server is listening,
+loopback round trips. Results are
+printed and can be written as JSON and compared against an earlier run.
+
+Usage:
+    python benchmarks/client_benchmark.py [--json OUT] [--compare BASELINE] [--tolerance 0.15]
+    python benchmarks/client_benchmark.py --host 127.0.0.1 --port 54321 --skip-network
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "visualization"))
+
+from tui.book import OrderBook  # noqa: E402
+from tui.connection import (  # noqa: E402
+    AsyncTCPConnection, ConnectionState, ServerConfig, FRAME, READ_CHUNK, WIRE_BINARY, WIRE_TEXT, parse_server_lines
+)
+from tui.generator import OrderGenerator, np  # noqa: E402
+from tui.headless import HeadlessRunner  # noqa: E402
+from tui.latency import LatencyHistogram, format_ns  # noqa: E402
+from tui.standin import MatchingBook  # noqa: E402
+from tui.transport import ProtocolTCPConnection  # noqa: E402
+
+
+REPEAT = 5
+STRATEGIES = ("market_making", "momentum", "arbitrage")
+
+
+def measure(fn: Callable[[], None], ops: int, repeat: int = REPEAT) -> Dict[str, float]:
+    """Best of `repeat` runs of fn, which performs `ops` operations"""
+    fn()  # warmup
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        best = min(best, time.perf_counter_ns() - start)
+    return {"ops": ops, "ns_per_op": best / ops, "ops_per_sec": ops * 1e9 / best}
+
+
+def bench_generation(n: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for strategy in STRATEGIES:
+        generator = OrderGenerator(seed=1)
+        generator.set_strategy(strategy)
+
+        def scalar():
+            for _ in range(n):
+                generator.generate_one()
+
+        results[f"generate.{strategy}"] = measure(scalar, n)
+        if np is not None:
+            results[f"generate_batch.{strategy}"] = measure(lambda: generator.generate_batch(n), n)
+    return results
+
+
+def server_output(lines: int, seed: int = 1) -> bytes:
+    """Synthetic OrderHandler.h output: mostly acks, some trades, the odd reject"""
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        roll = rng.random()
+        if roll < 0.6:
+            out.append(b"Order %d placed.\n" % i)
+        elif roll < 0.95:
+            out.append(b"Trade Executed: %d x %d\n" % (rng.randint(50, 150), rng.randint(1, 500)))
+        elif roll < 0.98:
+            out.append(b"Order %d canceled.\n" % i)
+        else:
+            out.append(b"Invalid Order")
+    return b"".join(out)
+
+
+def server_frames(frames: int, seed: int = 1) -> bytes:
+    """The binary-mode equivalent of server_output()"""
+    rng = random.Random(seed)
+    out = []
+    for i in range(frames):
+        roll = rng.random()
+        if roll < 0.6:
+            out.append(FRAME.pack(b"A", 0, 0, i))
+        elif roll < 0.95:
+            out.append(FRAME.pack(b"T", rng.randint(1, 500), rng.randint(50, 150), 0))
+        elif roll < 0.98:
+            out.append(FRAME.pack(b"X", 0, 0, i))
+        else:
+            out.append(FRAME.pack(b"R", 0, 0, 0))
+    return b"".join(out)
+
+
+def _chunks(data: bytes, size: int):
+    # odd chunk size so lines straddle reads
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def bench_receive(n: int) -> Dict[str, Dict[str, float]]:
+    chunks = _chunks(server_output(n), READ_CHUNK - 7)
+    results = {}
+
+    conn = AsyncTCPConnection(ServerConfig())
+
+    def frame():
+        for chunk in chunks:
+            conn._frame(chunk)
+
+    def frame_and_parse():
+        for chunk in chunks:
+            lines = conn._frame(chunk)
+            if lines:
+                parse_server_lines(lines)
+
+    def dispatch():
+        for chunk in chunks:
+            lines = conn._frame(chunk)
+            if lines:
+                conn._dispatch(lines)
+
+    results["receive.frame"] = measure(frame, n)
+    results["receive.frame_parse"] = measure(frame_and_parse, n)
+    results["receive.dispatch.streams"] = measure(dispatch, n)
+
+    proto = ProtocolTCPConnection(ServerConfig())
+
+    def buffered():
+        for chunk in chunks:
+            buf = proto.get_buffer(-1)
+            buf[:len(chunk)] = chunk
+            proto.buffer_updated(len(chunk))
+
+    results["receive.dispatch.protocol"] = measure(buffered, n)
+
+    frame_chunks = _chunks(server_frames(n), READ_CHUNK - 7)
+    binary = AsyncTCPConnection(ServerConfig())
+    binary.binary = True
+
+    def dispatch_binary():
+        for chunk in frame_chunks:
+            events = binary._frame_binary(chunk)
+            if events:
+                binary._dispatch_events(events)
+
+    results["receive.dispatch.binary"] = measure(dispatch_binary, n)
+    return results
+
+
+class _NullWriter:
+    """Stands in for a StreamWriter so only the client's own send-path cost is timed"""
+
+    def write(self, data: bytes):
+        pass
+
+
+def bench_send(n: int) -> Dict[str, Dict[str, float]]:
+    orders = list(OrderGenerator(seed=1).generate_batch(n).rows()) if np is not None else [
+        (o.side.value, o.quantity, o.price)
+        for o in (OrderGenerator(seed=1).generate_one() for _ in range(n))
+    ]
+    results = {}
+
+    def fstring():
+        for side, quantity, price in orders:
+            f"{side} {quantity} {price}\n".encode()
+
+    def pipelined(binary: bool) -> Callable[[], None]:
+        conn = AsyncTCPConnection(ServerConfig())
+        conn.writer = _NullWriter()
+        conn.state = ConnectionState.CONNECTED
+        conn.binary = binary
+
+        def run():
+            conn._send_times.clear()
+            conn._in_flight = 0
+            for side, quantity, price in orders:
+                conn._append(side, quantity, price)
+                if conn._out_count >= conn.config.batch_size:
+                    conn._flush_nowait()
+            conn._flush_nowait()
+        return run
+
+    results["send.encode_fstring"] = measure(fstring, n)
+    results["send.append_flush"] = measure(pipelined(False), n)
+    results["send.append_flush.binary"] = measure(pipelined(True), n)
+    if np is not None:
+        batch = OrderGenerator(seed=1).generate_batch(n)
+        results["send.batch_encode"] = measure(batch.encode, n)
+        results["send.batch_encode.binary"] = measure(batch.encode_frames, n)
+    return results
+
+
+def bench_book(n: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark.cpp's workload: alternating sides, prices 80-120, quantities 1-100"""
+    rng = random.Random(42)
+    orders = [
+        ("B" if i % 2 == 0 else "S", rng.randint(1, 100), rng.randint(80, 120))
+        for i in range(n)
+    ]
+    results = {}
+
+    def add_only():
+        book = OrderBook()
+        for order_id, (side, quantity, price) in enumerate(orders, 1):
+            book.add_order(order_id, side, price, quantity)
+
+    def add_match():
+        book = OrderBook()
+        for side, quantity, price in orders:
+            book.submit(side, quantity, price)
+
+    def add_cancel():
+        book = OrderBook()
+        for order_id, (side, quantity, price) in enumerate(orders, 1):
+            book.add_order(order_id, side, price, quantity)
+        for order_id in range(1, n + 1):
+            book.cancel_order(order_id)
+
+    def standin():
+        book = MatchingBook()
+        trades = []
+        for side, quantity, price in orders:
+            book.add(side, quantity, price, trades)
+            trades.clear()
+
+    results["book.array.add"] = measure(add_only, n)
+    results["book.array.add_match"] = measure(add_match, n)
+    results["book.array.add_cancel"] = measure(add_cancel, 2 * n)
+    results["book.standin.add_match"] = measure(standin, n)
+    return results
+
+
+async def _ping_pong(config: ServerConfig, iterations: int) -> Optional[LatencyHistogram]:
+    """ClientBenchmark.cpp's loop: one order out, wait for its reply, repeat"""
+    conn = AsyncTCPConnection(config)
+    replied = asyncio.Event()
+    conn.subscribe(lambda events: replied.set())
+    if not await conn.connect():
+        return None
+    try:
+        for _ in range(iterations):
+            replied.clear()
+            await conn.send_order("B", 100, 10)
+            await asyncio.wait_for(replied.wait(), 5.0)
+    finally:
+        await conn.disconnect()
+    return conn.latency
+
+
+def bench_network(host: str, port: int, iterations: int, duration: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for transport, wire in (("streams", WIRE_TEXT), ("protocol", WIRE_TEXT), ("protocol", WIRE_BINARY)):
+        config = ServerConfig(host=host, port=port, transport=transport, wire=wire)
+        name = transport if wire == WIRE_TEXT else f"{transport}.{wire}"
+        latency = asyncio.run(_ping_pong(config, iterations))
+        if latency is None:
+            raise ConnectionError(f"Failed to connect to server at {host}:{port}")
+        p50, p99 = latency.percentiles([0.5, 0.99])
+        results[f"roundtrip.{name}"] = {
+            "ops": latency.count,
+            "ns_per_op": latency.mean_ns,
+            "ops_per_sec": 1e9 / latency.mean_ns if latency.mean_ns else 0.0,
+            "p50_ns": p50,
+            "p99_ns": p99,
+        }
+
+        runner = HeadlessRunner(config, "market_making", 100_000, duration, seed=1)
+        report = asyncio.run(runner.run())
+        p50, p99 = report.latency.percentiles([0.5, 0.99])
+        results[f"pipelined.{name}"] = {
+            "ops": report.orders_sent,
+            "ns_per_op": 1e9 / report.throughput if report.throughput else 0.0,
+            "ops_per_sec": report.throughput,
+            "p50_ns": p50,
+            "p99_ns": p99,
+        }
+
+        # cancel-heavy flow, timing only the cancels
+        runner = HeadlessRunner(config, "cancel_heavy", 100_000, duration, seed=1)
+        report = asyncio.run(runner.run())
+        p50, p99 = report.cancel_latency.percentiles([0.5, 0.99])
+        results[f"cancels.{name}"] = {
+            "ops": report.cancels_sent,
+            "ns_per_op": 1e9 / report.cancel_rate if report.cancel_rate else 0.0,
+            "ops_per_sec": report.cancel_rate,
+            "p50_ns": p50,
+            "p99_ns": p99,
+        }
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline_path: str, tolerance: float) -> int:
+    """Print throughput changes against a baseline run; the count of regressions beyond tolerance"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    print(f"\n=== Compared to {baseline_path} (tolerance {tolerance:.0%}) ===")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("ops_per_sec"):
+            continue
+        change = current["ops_per_sec"] / before["ops_per_sec"] - 1.0
+        flag = ""
+        if change < -tolerance:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<30} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LOBSTER Python client benchmarks")
+    parser.add_argument("--orders", type=int, default=100_000, help="Operations per micro benchmark")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--iterations", type=int, default=10_000, help="Ping-pong round trips")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds of pipelined load")
+    parser.add_argument("--skip-network", action="store_true", help="Only run the in-process benchmarks")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed throughput drop (default: 0.15)")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    print("Running generation benchmarks...")
+    results.update(bench_generation(args.orders))
+    print("Running receive-path benchmarks...")
+    results.update(bench_receive(args.orders))
+    print("Running send-path benchmarks...")
+    results.update(bench_send(args.orders))
+    print("Running order book benchmarks...")
+    results.update(bench_book(args.orders))
+    skipped = None
+    if not args.skip_network:
+        print(f"Running loopback benchmarks against {args.host}:{args.port}...")
+        try:
+            results.update(bench_network(args.host, args.port, args.iterations, args.duration))
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            skipped = str(e)
+            print(f"Skipping loopback benchmarks: {skipped}")
+
+    print("\n=== Benchmark Results ===")
+    for name, r in results.items():
+        line = f"{name:<30} {r['ops_per_sec']:>14,.0f} ops/s  {format_ns(r['ns_per_op']):>10}/op"
+        if "p99_ns" in r:
+            line += f"  p50 {format_ns(r['p50_ns'])}  p99 {format_ns(r['p99_ns'])}"
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "numpy": np.__version__ if np is not None else None,
+                "network_skipped": skipped,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
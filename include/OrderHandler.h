@@ -8,6 +8,26 @@
 #include <atomic>
 #include "OrderBook.h"
 
+// Negotiated binary mode: after the client sends BINARY_HELLO as a text line and
+// gets BINARY_ACCEPT back, both directions switch to fixed-size frames shaped
+// like struct Order. Fields are little-endian, i.e. host order on x86 and ARM.
+// Client -> server types: 'B' buy, 'S' sell, 'C' cancel (orderId).
+// Server -> client types: 'A' ack (orderId), 'T' trade (price, quantity),
+// 'X' canceled (orderId), 'R' rejected.
+#pragma pack(push, 1)
+struct WireFrame {
+    char type;
+    char pad[3];
+    std::uint32_t quantity;
+    std::uint32_t price;
+    std::uint64_t orderId;
+};
+#pragma pack(pop)
+static_assert(sizeof(WireFrame) == 20, "WireFrame must match the client's 20-byte frame");
+
+const std::string BINARY_HELLO = "BIN 1";
+const std::string BINARY_ACCEPT = "Binary mode on\n";
+
 std::uint64_t getNextId()
 {
     static std::atomic<uint64_t> id = 0;
@@ -78,4 +98,61 @@ void handleClientCommand(OrderBook &book, std::string command, int clientSocket)
         sendMessage("Invalid Order", clientSocket);
         return;
     }
-}
\ No newline at end of file
+}
+
+void appendFrame(std::string &out, char type, std::uint32_t quantity, std::uint32_t price, std::uint64_t orderId)
+{
+    WireFrame frame{type, {0, 0, 0}, quantity, price, orderId};
+    out.append(reinterpret_cast<const char *>(&frame), sizeof(frame));
+}
+
+void handleBinaryCommand(OrderBook &book, const WireFrame &frame, std::string &out)
+{
+    if (frame.type == 'B' || frame.type == 'S')
+    {
+        if (frame.quantity > 0 && frame.price > 0)
+        {
+            std::uint64_t id = getNextId();
+            Order order;
+            order.orderId = id;
+            order.price = frame.price;
+            order.quantity = frame.quantity;
+            order.side = frame.type == 'B' ? Side::Buy : Side::Sell;
+            book.addOrder(order);
+            appendFrame(out, 'A', 0, 0, id);
+            book.match([&out](uint32_t tradePrice, uint32_t tradeQty) {
+                appendFrame(out, 'T', tradeQty, tradePrice, 0);
+            });
+            return;
+        }
+    }
+    else if (frame.type == 'C')
+    {
+        if (frame.orderId > 0)
+        {
+            book.cancelOrder(frame.orderId);
+            appendFrame(out, 'X', 0, 0, frame.orderId);
+            return;
+        }
+    }
+    appendFrame(out, 'R', 0, 0, 0);
+}
+
+// Consume every whole frame at the front of buffer; all replies go out in one send()
+void handleBinaryFrames(OrderBook &book, std::string &buffer, int clientSocket)
+{
+    std::string out;
+    size_t offset = 0;
+    while (buffer.size() - offset >= sizeof(WireFrame))
+    {
+        WireFrame frame;
+        std::memcpy(&frame, buffer.data() + offset, sizeof(frame));
+        handleBinaryCommand(book, frame, out);
+        offset += sizeof(frame);
+    }
+    buffer.erase(0, offset);
+    if (!out.empty())
+    {
+        sendMessage(out, clientSocket);
+    }
+}
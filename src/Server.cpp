@@ -12,20 +12,32 @@ void clientHandler(int clientSocket, OrderBook& book)
 {
     const size_t MAX_LINE = 1024;
     std::string buffer;
+    bool binary = false;
     while (true) {
         char temp[512];
         ssize_t bytesRead = read(clientSocket, temp, sizeof(temp));
         if (bytesRead <= 0) break;
         buffer.append(temp, bytesRead);
-        if (buffer.size() > MAX_LINE) {
-            std::cerr << "Line too long, closing connection\n";
-            break;
+        if (!binary) {
+            if (buffer.size() > MAX_LINE) {
+                std::cerr << "Line too long, closing connection\n";
+                break;
+            }
+            size_t pos;
+            while (!binary && (pos = buffer.find('\n')) != std::string::npos) {
+                std::string command = buffer.substr(0, pos);
+                buffer.erase(0, pos + 1);
+                if (command == BINARY_HELLO) {
+                    // everything after this line is fixed-size frames
+                    sendMessage(BINARY_ACCEPT, clientSocket);
+                    binary = true;
+                } else {
+                    handleClientCommand(book, command, clientSocket);
+                }
+            }
         }
-        size_t pos;
-        while ((pos = buffer.find('\n')) != std::string::npos) {
-            std::string command = buffer.substr(0, pos);
-            buffer.erase(0, pos + 1);
-            handleClientCommand(book, command, clientSocket);
+        if (binary) {
+            handleBinaryFrames(book, buffer, clientSocket);
         }
     }
     close(clientSocket);
@@ -8,6 +8,9 @@ of algorithmic trading activity.
 
 Usage:
     python lobster_tui.py [--host HOST] [--port PORT]
+    python lobster_tui.py --headless [--strategy NAME] [--rate N] [--duration SECS]
+    python lobster_tui.py --serve [--port PORT] [--latency MS] [--jitter MS] [--max-rate N]
+    python lobster_tui.py --profile [PREFIX] [--profile-memory] ...
     
 Requirements:
     pip install textual rich
@@ -18,25 +21,20 @@ import sys
 
 
 def check_dependencies():
-    missing = []
-    try:
-        import textual
-    except ImportError:
-        missing.append("textual")
-    try:
-        import rich
-    except ImportError:
-        missing.append("rich")
-    
+    # find_spec only locates the packages; the UI imports them when it starts
+    from tui.lazy import missing as find_missing
+    missing = find_missing(("textual", "rich"))
+
     if missing:
         print("Missing required dependencies:", ", ".join(missing))
         print("Install with: pip install textual rich")
         sys.exit(1)
 
 
+STRATEGIES = ("market_making", "momentum", "arbitrage", "cancel_replace", "cancel_heavy")
+
+
 def main():
-    check_dependencies()
-    
     parser = argparse.ArgumentParser(
         description="LOBSTER HFT Engine TUI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -46,6 +44,8 @@ Controls:
   1           Switch to Market Making strategy
   2           Switch to Momentum strategy  
   3           Switch to Arbitrage strategy
+  4           Switch to Cancel/Replace strategy
+  5           Switch to Cancel-Heavy strategy
   +/-         Increase/Decrease order rate
   SPACE       Pause/Resume order generation
   R           Reset session statistics
@@ -54,6 +54,10 @@ Examples:
   python lobster_tui.py                    # Default (localhost:54321)
   python lobster_tui.py --port 12345       # Custom port
   python lobster_tui.py --host 192.168.1.5 # Remote server
+  python lobster_tui.py --headless --rate 20000 --duration 30
+                                           # Load test without a terminal UI
+  python lobster_tui.py --serve --latency 2 --jitter 1
+                                           # Python stand-in for the C++ server
         """
     )
     
@@ -71,10 +75,316 @@ Examples:
         help="Server port (default: 54321)"
     )
     
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=30.0,
+        help="UI refresh rate for the tape and order panels (default: 30)"
+    )
+
+    parser.add_argument(
+        "--tape-lines",
+        type=int,
+        default=2000,
+        help="Lines kept on screen per log panel; older lines spill to disk (default: 2000)"
+    )
+
+    parser.add_argument(
+        "--scrollback-dir",
+        type=str,
+        default=None,
+        help="Keep on-disk tape history in this directory (default: a temp file removed on exit)"
+    )
+
+    parser.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Journal all wire traffic with timestamps to a binary file"
+    )
+
+    parser.add_argument(
+        "--analyze-journal",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Print a latency/fill summary of a wire journal and exit (requires numpy)"
+    )
+
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run strategies without the UI and print a throughput/latency report"
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a Python stand-in for the C++ server on --host/--port instead of a client"
+    )
+
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="Stand-in server: delay every reply by this many milliseconds"
+    )
+
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="Stand-in server: add up to this many random milliseconds per reply"
+    )
+
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=0.0,
+        help="Stand-in server: match at most this many commands/sec (default: unlimited)"
+    )
+
+    parser.add_argument(
+        "--strategy",
+        choices=STRATEGIES,
+        default="market_making",
+        help="Order strategy for headless mode (default: market_making)"
+    )
+
+    parser.add_argument(
+        "--cancel-ratio",
+        type=float,
+        default=None,
+        help="Cancel strategies: share of acked orders later cancelled (0-1)"
+    )
+
+    parser.add_argument(
+        "--replace-ratio",
+        type=float,
+        default=None,
+        help="Cancel strategies: share of cancels followed by a replacement order (0-1)"
+    )
+
+    parser.add_argument(
+        "--order-lifetime",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="Cancel strategies: mean milliseconds an order rests before it is cancelled"
+    )
+
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1000.0,
+        help="Target orders/sec for headless mode (default: 1000)"
+    )
+
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=10.0,
+        help="Headless run length in seconds (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="Headless mode: generate orders in NumPy batches (requires numpy)"
+    )
+    
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=1,
+        help="Headless mode: spread orders round-robin over N sockets (default: 1)"
+    )
+
+    parser.add_argument(
+        "--transport",
+        choices=["streams", "protocol"],
+        default="streams",
+        help="asyncio streams, or a raw asyncio.Protocol (uses uvloop if installed)"
+    )
+
+    parser.add_argument(
+        "--binary",
+        action="store_true",
+        help="Ask the server for fixed-size binary frames; falls back to text if it declines"
+    )
+
+    parser.add_argument(
+        "--write-buffer",
+        type=int,
+        default=None,
+        metavar="KB",
+        help="Headless mode: pause sending above this many KiB of unsent data (default: 256)"
+    )
+
+    parser.add_argument(
+        "--shadow",
+        action="store_true",
+        help="Headless mode: check every server trade against a local reference book"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Headless mode: split the rate across N generator processes (default: 1)"
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics"
+    )
+
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Rewrite a JSON snapshot of all metrics to PATH every --metrics-interval"
+    )
+
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between JSON metric dumps (default: 1)"
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed the strategies for a reproducible order stream"
+    )
+
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Headless mode: record every sent order to a binary file"
+    )
+
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Headless mode: replay a recorded order file instead of generating"
+    )
+
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed multiplier; 0 replays as fast as possible (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="lobster-profile",
+        default=None,
+        metavar="PREFIX",
+        help="Sample the client's stacks and write PREFIX.collapsed and PREFIX.txt at exit"
+    )
+
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=5.0,
+        metavar="MS",
+        help="Milliseconds between profiler samples (default: 5)"
+    )
+
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile: also trace allocations and report the top allocators (slow)"
+    )
+
     args = parser.parse_args()
+
+    if not args.profile:
+        run(args)
+        return
+    from tui.profiling import Profiler
+    with Profiler(args.profile, interval=args.profile_interval / 1000.0, memory=args.profile_memory):
+        run(args)
+
+
+def run(args: argparse.Namespace):
+    if args.analyze_journal:
+        from tui.journal import summarize
+        print(summarize(args.analyze_journal))
+        return
+
+    if args.serve:
+        from tui.standin import run_standin
+        sys.exit(run_standin(
+            host=args.host,
+            port=args.port,
+            latency=args.latency / 1000.0,
+            jitter=args.jitter / 1000.0,
+            max_rate=args.max_rate,
+            seed=args.seed
+        ))
+
+    if args.headless:
+        from tui.headless import run_headless
+        sys.exit(run_headless(
+            host=args.host,
+            port=args.port,
+            strategy=args.strategy,
+            rate=args.rate,
+            duration=args.duration,
+            vectorized=args.vectorized,
+            seed=args.seed,
+            record_path=args.record,
+            replay_path=args.replay,
+            replay_speed=args.speed,
+            journal_path=args.journal,
+            connections=args.connections,
+            workers=args.workers,
+            transport=args.transport,
+            write_high_water=args.write_buffer * 1024 if args.write_buffer else None,
+            shadow=args.shadow,
+            wire="binary" if args.binary else "text",
+            metrics_port=args.metrics_port,
+            metrics_json=args.metrics_json,
+            metrics_interval=args.metrics_interval,
+            cancel_ratio=args.cancel_ratio,
+            replace_ratio=args.replace_ratio,
+            order_lifetime=args.order_lifetime / 1000.0 if args.order_lifetime is not None else None
+        ))
+
+    check_dependencies()
     
     from tui import run_app
-    run_app(host=args.host, port=args.port)
+    run_app(
+        host=args.host,
+        port=args.port,
+        render_fps=args.fps,
+        tape_lines=args.tape_lines,
+        scrollback_dir=args.scrollback_dir,
+        seed=args.seed,
+        journal_path=args.journal,
+        transport=args.transport,
+        wire="binary" if args.binary else "text",
+        metrics_port=args.metrics_port,
+        metrics_json=args.metrics_json,
+        metrics_interval=args.metrics_interval
+    )
 
 
 if __name__ == "__main__":
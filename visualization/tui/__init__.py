@@ -1,19 +1,71 @@
-from .app import LobsterApp, run_app
-from .connection import AsyncTCPConnection, ServerConfig, ConnectionState
-from .generator import OrderGenerator, OrderSide, GeneratedOrder
-from .widgets import HeaderWidget, AlgoPanel, TapePanel, TelemetryPanel
+# Every public name is resolved on first access (PEP 562), so importing the
+# package or one of its layers never drags in Textual, numpy or the rest.
+_LAZY = {
+    "LobsterApp": ".app",
+    "run_app": ".app",
+    "HeaderWidget": ".widgets",
+    "AlgoPanel": ".widgets",
+    "TapePanel": ".widgets",
+    "DepthPanel": ".widgets",
+    "TelemetryPanel": ".widgets",
+    "AsyncTCPConnection": ".connection",
+    "ServerConfig": ".connection",
+    "ConnectionState": ".connection",
+    "FlowStats": ".connection",
+    "ServerEvent": ".connection",
+    "AckEvent": ".connection",
+    "TradeEvent": ".connection",
+    "CancelEvent": ".connection",
+    "RejectEvent": ".connection",
+    "NoticeEvent": ".connection",
+    "parse_server_lines": ".connection",
+    "ProtocolTCPConnection": ".transport",
+    "create_connection": ".transport",
+    "OrderGenerator": ".generator",
+    "OrderSide": ".generator",
+    "GeneratedOrder": ".generator",
+    "OrderBatch": ".generator",
+    "GeneratedCancel": ".generator",
+    "CancelProfile": ".generator",
+    "CancelReplaceStrategy": ".generator",
+    "OrderRecorder": ".replay",
+    "OrderReplayer": ".replay",
+    "WireJournal": ".journal",
+    "JournalReader": ".journal",
+    "OrderTracker": ".tracker",
+    "TrackedOrder": ".tracker",
+    "OrderBook": ".book",
+    "ShadowMatcher": ".book",
+    "ConnectionPool": ".pool",
+    "MultiProcessRunner": ".multiproc",
+    "SharedStats": ".multiproc",
+    "MatchingBook": ".standin",
+    "StandInServer": ".standin",
+    "StandInConfig": ".standin",
+    "MetricsRegistry": ".metrics",
+    "MetricsExporter": ".metrics",
+    "LoopLagProbe": ".metrics",
+    "Profiler": ".profiling",
+    "SamplingProfiler": ".profiling",
+    "SessionAnalytics": ".analytics",
+    "WindowRing": ".analytics",
+    "WindowStats": ".analytics",
+}
 
-__all__ = [
-    "LobsterApp",
-    "run_app",
-    "AsyncTCPConnection",
-    "ServerConfig", 
-    "ConnectionState",
-    "OrderGenerator",
-    "OrderSide",
-    "GeneratedOrder",
-    "HeaderWidget",
-    "AlgoPanel",
-    "TapePanel",
-    "TelemetryPanel",
-]
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+__all__ = list(_LAZY)
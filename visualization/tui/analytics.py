@@ -0,0 +1,208 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .connection import AckEvent, RejectEvent, ServerEvent, TradeEvent
+
+
+WINDOWS = (1.0, 10.0, 60.0)
+BUCKET_SECONDS = 0.1
+
+# per-bucket sums
+SENT, SENT_QTY, TRADES, TRADED_QTY, NOTIONAL = range(5)
+FIELDS = 5
+
+
+@dataclass(slots=True)
+class WindowStats:
+    window: float
+    # how much of the window has actually elapsed
+    seconds: float
+    orders: int
+    sent_qty: int
+    trades: int
+    traded_qty: int
+    notional: int
+
+    @property
+    def rate(self) -> float:
+        return self.orders / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def traded_rate(self) -> float:
+        return self.traded_qty / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def vwap(self) -> float:
+        return self.notional / self.traded_qty if self.traded_qty else 0.0
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.traded_qty / self.sent_qty if self.sent_qty else 0.0
+
+    @property
+    def trades_per_order(self) -> float:
+        return self.trades / self.orders if self.orders else 0.0
+
+
+class WindowRing:
+    """Sums over several trailing windows, kept in a ring of fixed time buckets
+
+    Each window keeps a running total; an event adds to its bucket and to
+    every total, and a bucket sliding out of a window is subtracted from that
+    window's total as time advances. Recording and reading are O(1) in the
+    length of the history.
+    """
+
+    def __init__(self, windows: Sequence[float] = WINDOWS, bucket: float = BUCKET_SECONDS):
+        self.windows = tuple(windows)
+        self.bucket = bucket
+        self._spans = [max(1, round(w / bucket)) for w in self.windows]
+        self.size = max(self._spans)
+        self._ring = [[0] * FIELDS for _ in range(self.size)]
+        self._sums = [[0] * FIELDS for _ in self.windows]
+        self._tick = 0
+        self._now = 0.0
+
+    def advance(self, now: float):
+        """Move the current bucket up to `now` (seconds, never decreasing)"""
+        self._now = now
+        tick = int(now / self.bucket)
+        if tick <= self._tick:
+            return
+        ring, size = self._ring, self.size
+        if tick - self._tick >= size:
+            for bucket in ring:
+                bucket[:] = (0,) * FIELDS
+            for sums in self._sums:
+                sums[:] = (0,) * FIELDS
+            self._tick = tick
+            return
+        for new in range(self._tick + 1, tick + 1):
+            for sums, span in zip(self._sums, self._spans):
+                leaving = ring[(new - span) % size]
+                for i in range(FIELDS):
+                    sums[i] -= leaving[i]
+            # the largest window has just dropped this bucket, so it is free to reuse
+            ring[new % size][:] = (0,) * FIELDS
+        self._tick = tick
+
+    def add_sent(self, count: int, quantity: int):
+        bucket = self._ring[self._tick % self.size]
+        bucket[SENT] += count
+        bucket[SENT_QTY] += quantity
+        for sums in self._sums:
+            sums[SENT] += count
+            sums[SENT_QTY] += quantity
+
+    def add_trade(self, price: int, quantity: int):
+        bucket = self._ring[self._tick % self.size]
+        notional = price * quantity
+        bucket[TRADES] += 1
+        bucket[TRADED_QTY] += quantity
+        bucket[NOTIONAL] += notional
+        for sums in self._sums:
+            sums[TRADES] += 1
+            sums[TRADED_QTY] += quantity
+            sums[NOTIONAL] += notional
+
+    def stats(self) -> List[WindowStats]:
+        """One WindowStats per window as of the last advance()"""
+        # the current bucket is only partly elapsed
+        partial = self._now - self._tick * self.bucket
+        result = []
+        for window, span, sums in zip(self.windows, self._spans, self._sums):
+            seconds = min((span - 1) * self.bucket + partial, self._now)
+            result.append(WindowStats(window, seconds, *sums))
+        return result
+
+
+class SessionAnalytics:
+    """Sliding-window rate, volume, VWAP and fill ratio per strategy
+
+    Each strategy has its own WindowRing running on that strategy's active
+    time, so its windows freeze while another strategy is selected and
+    strategies stay comparable after switching. Trades are credited to the
+    strategy that sent the order they follow, pairing acks with sends in
+    FIFO order as OrderTracker does.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[float] = WINDOWS,
+        bucket: float = BUCKET_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.windows = tuple(windows)
+        self.bucket = bucket
+        self.clock = clock
+        self.rings: Dict[str, WindowRing] = {}
+        self.active: Optional[str] = None
+        self._ring: Optional[WindowRing] = None
+        # active seconds the current strategy had banked when it was selected, and when that was
+        self._banked = 0.0
+        self._resumed = 0.0
+        self._elapsed: Dict[str, float] = {}
+        # [ring, order count] runs, oldest first; one entry per run of same-strategy sends
+        self._unacked: deque = deque()
+        self._aggressor: Optional[WindowRing] = None
+
+    def set_strategy(self, name: str):
+        if name == self.active:
+            return
+        now = self.clock()
+        if self.active is not None:
+            self._elapsed[self.active] = self._banked + now - self._resumed
+        ring = self.rings.get(name)
+        if ring is None:
+            ring = self.rings[name] = WindowRing(self.windows, self.bucket)
+        self.active = name
+        self._ring = ring
+        self._banked = self._elapsed.get(name, 0.0)
+        self._resumed = now
+
+    def _active_ring(self) -> WindowRing:
+        ring = self._ring
+        ring.advance(self._banked + self.clock() - self._resumed)
+        return ring
+
+    def on_sent(self, quantity: int, count: int = 1):
+        """`count` orders totalling `quantity` sent under the active strategy"""
+        ring = self._active_ring()
+        ring.add_sent(count, quantity)
+        unacked = self._unacked
+        if unacked and unacked[-1][0] is ring:
+            unacked[-1][1] += count
+        else:
+            unacked.append([ring, count])
+
+    def _pop_unacked(self) -> Optional[WindowRing]:
+        unacked = self._unacked
+        if not unacked:
+            return None
+        run = unacked[0]
+        run[1] -= 1
+        if not run[1]:
+            unacked.popleft()
+        return run[0]
+
+    def on_events(self, events: List[ServerEvent]):
+        if self._ring is not None:
+            self._active_ring()
+        for event in events:
+            kind = type(event)
+            if kind is AckEvent:
+                self._aggressor = self._pop_unacked()
+            elif kind is TradeEvent:
+                if self._aggressor is not None:
+                    self._aggressor.add_trade(event.price, event.quantity)
+            elif kind is RejectEvent:
+                self._pop_unacked()
+                self._aggressor = None
+
+    def snapshot(self) -> Dict[str, List[WindowStats]]:
+        """Window stats for every strategy seen; inactive ones as they were when left"""
+        if self._ring is not None:
+            self._active_ring()
+        return {name: ring.stats() for name, ring in self.rings.items()}
@@ -1,11 +1,23 @@
 import asyncio
+import time
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal
 from textual.binding import Binding
+from textual.css.query import NoMatches
 
-from .connection import AsyncTCPConnection, ServerConfig, ConnectionState
-from .generator import OrderGenerator
-from .widgets import HeaderWidget, AlgoPanel, TapePanel, TelemetryPanel, FooterWidget
+from .analytics import SessionAnalytics
+from .connection import STREAMS, PROTOCOL, WIRE_TEXT, FlowStats, ServerConfig, ConnectionState, ServerEvent
+from .generator import GeneratedCancel, OrderGenerator, MIN_ORDERS_PER_SECOND, MAX_ORDERS_PER_SECOND
+from .latency import LatencyHistogram
+from .metrics import MetricsExporter, MetricsRegistry, register_connection, register_generator
+from .pacing import Pacer
+from .render import RENDER_FPS, OrderFrameBuffer, TapeFrameBuffer
+from .scrollback import DEFAULT_TAPE_LINES, Scrollback
+from .tracker import OrderTracker
+from .transport import create_connection, install_uvloop
+from .widgets import (
+    HeaderWidget, AlgoPanel, TapePanel, DepthPanel, TelemetryPanel, FooterWidget, ScrollbackScreen
+)
 
 
 class LobsterApp(App):
@@ -33,63 +45,126 @@ class LobsterApp(App):
         Binding("1", "strategy_mm", "Market Making", show=False),
         Binding("2", "strategy_mom", "Momentum", show=False),
         Binding("3", "strategy_arb", "Arbitrage", show=False),
+        Binding("4", "strategy_cancel", "Cancel/Replace", show=False),
+        Binding("5", "strategy_cancel_heavy", "Cancel-Heavy", show=False),
         Binding("plus", "speed_up", "Speed Up", show=False),
         Binding("equal", "speed_up", "Speed Up", show=False),
         Binding("minus", "speed_down", "Speed Down", show=False),
         Binding("space", "toggle_pause", "Pause/Resume", show=False),
         Binding("r", "reset_stats", "Reset Stats", show=False),
+        Binding("slash", "history", "History", show=False),
     ]
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 54321):
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 54321,
+        render_fps: float = RENDER_FPS,
+        tape_lines: int = DEFAULT_TAPE_LINES,
+        scrollback_dir: str | None = None,
+        seed: int | None = None,
+        journal_path: str | None = None,
+        transport: str = STREAMS,
+        wire: str = WIRE_TEXT,
+        metrics: MetricsExporter | None = None
+    ):
         super().__init__()
-        self.config = ServerConfig(host=host, port=port)
-        self.connection = AsyncTCPConnection(self.config)
-        self.generator = OrderGenerator(orders_per_second=100.0)
+        self.config = ServerConfig(
+            host=host, port=port, journal_path=journal_path, transport=transport, wire=wire
+        )
+        self.connection = create_connection(self.config)
+        self.generator = OrderGenerator(orders_per_second=100.0, seed=seed)
+        self.pacer = Pacer(self.generator.orders_per_second, burst_seconds=0.25)
+        self.tracker = OrderTracker()
+        self.analytics = SessionAnalytics()
+        self.analytics.set_strategy(self.generator.current_strategy.name())
+        self.render_fps = render_fps
+        self._tape_frame = TapeFrameBuffer()
+        self._order_frame = OrderFrameBuffer()
+        self.tape_lines = tape_lines
+        self.tape_scrollback = Scrollback("tape", scrollback_dir, tape_lines)
+        self.order_scrollback = Scrollback("orders", scrollback_dir, tape_lines)
         self._order_task: asyncio.Task | None = None
         self._stats_task: asyncio.Task | None = None
         self._paused = False
-        self._orders_this_second = 0
-        self._last_rate_check = 0.0
+        self.render_time = LatencyHistogram()
+        # what the reset key subtracts for display; the sources are exported and only grow
+        self._reset_totals = (0, 0)
+        self._reset_latency = LatencyHistogram()
+        self._reset_cancel_latency = LatencyHistogram()
+        self._reset_flow = FlowStats()
+        self.metrics = metrics
+        if metrics:
+            register_connection(metrics.registry, self.connection)
+            register_generator(metrics.registry, self.generator, self.pacer)
+            metrics.registry.histogram("render_seconds", "One UI frame flush", self.render_time)
 
     def compose(self) -> ComposeResult:
         yield HeaderWidget(self.config.host, self.config.port)
         with Container(id="main-container"):
             with Horizontal(id="panels"):
-                yield AlgoPanel()
-                yield TapePanel()
+                yield AlgoPanel(self.tape_lines, self.order_scrollback)
+                yield TapePanel(self.tape_lines, self.tape_scrollback)
+                yield DepthPanel()
                 yield TelemetryPanel()
         yield FooterWidget()
 
     async def on_mount(self):
-        self.connection.on_message = self._handle_server_message
+        self.connection.subscribe(self.tracker.on_events)
+        self.connection.subscribe(self.analytics.on_events)
+        self.connection.subscribe(self.generator.on_events)
+        self.connection.subscribe(self._handle_server_events)
         self.connection.on_state_change = self._handle_connection_state
-        
+        if self.metrics:
+            await self.metrics.start()
+
         connected = await self.connection.connect()
         header = self.query_one(HeaderWidget)
         header.set_connected(connected)
+        self.set_interval(1.0 / self.render_fps, self._render_frame)
         
         if connected:
             self._order_task = asyncio.create_task(self._order_loop())
             self._stats_task = asyncio.create_task(self._stats_loop())
 
     async def on_unmount(self):
-        self.connection.on_message = None
+        self.connection.unsubscribe(self.tracker.on_events)
+        self.connection.unsubscribe(self.analytics.on_events)
+        self.connection.unsubscribe(self.generator.on_events)
+        self.connection.unsubscribe(self._handle_server_events)
         self.connection.on_state_change = None
         if self._order_task:
             self._order_task.cancel()
         if self._stats_task:
             self._stats_task.cancel()
         await self.connection.disconnect()
+        if self.metrics:
+            await self.metrics.stop()
+        self.tape_scrollback.close()
+        self.order_scrollback.close()
 
-    def _handle_server_message(self, message: str):
-        self.call_later(self._log_tape, message)
+    def _handle_server_events(self, events: list[ServerEvent]):
+        self._tape_frame.extend(events)
 
-    def _log_tape(self, message: str):
+    def _render_frame(self):
+        started = time.perf_counter_ns()
         try:
             tape = self.query_one(TapePanel)
-            tape.log_message(message)
-        except Exception:
-            pass
+            orders_panel = self.query_one(AlgoPanel)
+            depth = self.query_one(DepthPanel)
+        except NoMatches:
+            # panels not mounted yet or already gone: keep the frame buffered
+            return
+        if len(self._tape_frame) or self._tape_frame.suppressed:
+            events, summary = self._tape_frame.drain()
+            tape.log_events(events, summary)
+        if len(self._order_frame) or self._order_frame.suppressed:
+            orders, summary = self._order_frame.drain()
+            orders_panel.log_orders(orders, summary)
+        dirty = self.tracker.pop_dirty()
+        if dirty:
+            depth.apply(self.tracker, dirty)
+        self.render_time.record(time.perf_counter_ns() - started)
 
     def _handle_connection_state(self, state: ConnectionState):
         self.call_later(self._update_connection_ui, state)
@@ -102,71 +177,96 @@ class LobsterApp(App):
             pass
 
     async def _order_loop(self):
-        import time
-        self._last_rate_check = time.time()
-        
+        self.pacer.reset()
+
         while True:
             if self._paused:
                 await asyncio.sleep(0.1)
+                self.pacer.reset()
                 continue
-            
-            order = self.generator.generate_one()
-            success = await self.connection.send_order(
-                order.side.value,
-                order.quantity,
-                order.price
-            )
-            
-            if success:
-                algo = self.query_one(AlgoPanel)
-                algo.log_order(order.side_str, order.quantity, order.price)
-                self._orders_this_second += 1
-            
-            await asyncio.sleep(self.generator.delay_between_orders)
+
+            self.pacer.set_rate(self.generator.orders_per_second)
+            due = await self.pacer.acquire()
+            sent = 0
+
+            for _ in range(due):
+                order = self.generator.generate_one()
+                if type(order) is GeneratedCancel:
+                    if not await self.connection.submit_cancel(order.order_id):
+                        break
+                    sent += 1
+                    continue
+                success = await self.connection.submit_order(
+                    order.side.value,
+                    order.quantity,
+                    order.price
+                )
+                if not success:
+                    break
+                self.generator.on_sent(order)
+                self.tracker.on_sent(order.side.value, order.quantity, order.price)
+                self.analytics.on_sent(order.quantity)
+                self._order_frame.push(order)
+                sent += 1
+
+            self.pacer.record(sent)
 
     async def _stats_loop(self):
-        import time
-        
         while True:
             await asyncio.sleep(0.5)
-            
-            current_time = time.time()
-            elapsed = current_time - self._last_rate_check
-            
-            if elapsed >= 1.0:
-                rate = self._orders_this_second / elapsed
-                self._orders_this_second = 0
-                self._last_rate_check = current_time
-            else:
-                rate = self._orders_this_second / max(elapsed, 0.1)
-            
+
+            pacing = self.pacer.snapshot()
             telemetry = self.query_one(TelemetryPanel)
+            orders, volume = self._reset_totals
             telemetry.update_live_stats(
-                self.generator.total_generated,
-                self.generator.total_volume,
-                rate,
-                self.generator.current_strategy.name()
+                self.generator.total_generated - orders,
+                self.generator.total_volume - volume,
+                pacing.achieved_rate,
+                self.generator.current_strategy.name(),
+                target=pacing.target_rate,
+                shortfall=pacing.shortfall
+            )
+            telemetry.update_latency(
+                self.connection.latency.since(self._reset_latency),
+                self.connection.cancel_latency.since(self._reset_cancel_latency)
             )
+            telemetry.update_flow(
+                self.connection.flow_stats().since(self._reset_flow), self.config.write_high_water
+            )
+            telemetry.update_analytics(self.analytics.snapshot(), self.analytics.active)
 
     def action_strategy_mm(self):
         self.generator.set_strategy("market_making")
+        self.analytics.set_strategy(self.generator.current_strategy.name())
         self.notify("Strategy: Market Making")
 
     def action_strategy_mom(self):
         self.generator.set_strategy("momentum")
+        self.analytics.set_strategy(self.generator.current_strategy.name())
         self.notify("Strategy: Momentum")
 
     def action_strategy_arb(self):
         self.generator.set_strategy("arbitrage")
+        self.analytics.set_strategy(self.generator.current_strategy.name())
         self.notify("Strategy: Arbitrage")
 
+    def action_strategy_cancel(self):
+        self.generator.set_strategy("cancel_replace")
+        self.analytics.set_strategy(self.generator.current_strategy.name())
+        self.notify("Strategy: Cancel/Replace")
+
+    def action_strategy_cancel_heavy(self):
+        self.generator.set_strategy("cancel_heavy")
+        self.analytics.set_strategy(self.generator.current_strategy.name())
+        self.notify("Strategy: Cancel-Heavy")
+
     def action_speed_up(self):
-        new_rate = min(1000.0, self.generator.orders_per_second * 1.5)
+        new_rate = min(MAX_ORDERS_PER_SECOND, self.generator.orders_per_second * 1.5)
         self.generator.set_rate(new_rate)
         self.notify(f"Speed: {new_rate:.0f} orders/sec")
 
     def action_speed_down(self):
-        new_rate = max(1.0, self.generator.orders_per_second / 1.5)
+        new_rate = max(MIN_ORDERS_PER_SECOND, self.generator.orders_per_second / 1.5)
         self.generator.set_rate(new_rate)
         self.notify(f"Speed: {new_rate:.0f} orders/sec")
 
@@ -175,11 +275,52 @@ class LobsterApp(App):
         status = "PAUSED" if self._paused else "RUNNING"
         self.notify(f"Status: {status}")
 
+    def action_history(self):
+        if not isinstance(self.screen, ScrollbackScreen):
+            self.push_screen(ScrollbackScreen([self.tape_scrollback, self.order_scrollback]))
+
     def action_reset_stats(self):
-        self.generator.reset_stats()
+        self._reset_totals = (self.generator.total_generated, self.generator.total_volume)
+        self._reset_latency = self.connection.latency.copy()
+        self._reset_cancel_latency = self.connection.cancel_latency.copy()
+        self._reset_flow = self.connection.flow_stats()
         self.notify("Stats reset")
 
 
-def run_app(host: str = "127.0.0.1", port: int = 54321):
-    app = LobsterApp(host=host, port=port)
+def run_app(
+    host: str = "127.0.0.1",
+    port: int = 54321,
+    render_fps: float = RENDER_FPS,
+    tape_lines: int = DEFAULT_TAPE_LINES,
+    scrollback_dir: str | None = None,
+    seed: int | None = None,
+    journal_path: str | None = None,
+    transport: str = STREAMS,
+    wire: str = WIRE_TEXT,
+    metrics_port: int | None = None,
+    metrics_json: str | None = None,
+    metrics_interval: float = 1.0
+):
+    if transport == PROTOCOL:
+        install_uvloop()
+    metrics = None
+    if metrics_port is not None or metrics_json:
+        metrics = MetricsExporter(
+            MetricsRegistry(), port=metrics_port, json_path=metrics_json, interval=metrics_interval
+        )
+    app = LobsterApp(
+        host=host,
+        port=port,
+        render_fps=render_fps,
+        tape_lines=tape_lines,
+        scrollback_dir=scrollback_dir,
+        seed=seed,
+        journal_path=journal_path,
+        transport=transport,
+        wire=wire,
+        metrics=metrics
+    )
     app.run()
+    if scrollback_dir:
+        for scrollback in (app.tape_scrollback, app.order_scrollback):
+            print(f"{scrollback.name.capitalize()} history: {scrollback.path}")
@@ -0,0 +1,299 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .connection import AckEvent, CancelEvent, RejectEvent, ServerEvent, TradeEvent
+from .tracker import BUY, SELL
+
+
+# covers every band the strategies quote in (50-150, 90-110) without growing
+DEFAULT_MIN_PRICE = 1
+DEFAULT_SPAN = 256
+# refuse to grow the level arrays past this many ticks
+MAX_SPAN = 1 << 20
+
+
+class OrderBook:
+    """Reference of OrderBook.h over dense, price-indexed level arrays
+
+    Each side is a list of per-price FIFOs of order slots, so finding a level
+    is an index rather than a tree walk. Best bid/ask are cursors into those
+    arrays and only step over empty levels when their own level drains.
+    Orders live in parallel slot arrays addressed through an id -> slot map;
+    a cancelled order is zeroed and its slot reclaimed once it leaves its FIFO.
+    """
+
+    def __init__(self, min_price: int = DEFAULT_MIN_PRICE, span: int = DEFAULT_SPAN):
+        self.on_trade: Optional[Callable[[int, int], None]] = None
+        self.next_id = 0
+        self._base = min_price
+        self._span = span
+        self._bids: List[deque] = [deque() for _ in range(span)]
+        self._asks: List[deque] = [deque() for _ in range(span)]
+        self._bid_live = [0] * span
+        self._ask_live = [0] * span
+        # level indices; -1 / span mean the side is empty
+        self._best_bid = -1
+        self._best_ask = span
+        self._slot_id: List[int] = []
+        self._slot_price: List[int] = []
+        self._slot_qty: List[int] = []
+        self._slot_buy: List[bool] = []
+        self._free: List[int] = []
+        self._index: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._index
+
+    def best_bid(self) -> Optional[int]:
+        return self._base + self._best_bid if self._best_bid >= 0 else None
+
+    def best_ask(self) -> Optional[int]:
+        return self._base + self._best_ask if self._best_ask < self._span else None
+
+    def remaining(self, order_id: int) -> int:
+        slot = self._index.get(order_id)
+        return 0 if slot is None else self._slot_qty[slot]
+
+    def add_order(self, order_id: int, side: str, price: int, quantity: int) -> bool:
+        """OrderBook::addOrder: rest the order without matching
+
+        Duplicate ids are ignored, and so are prices below 1, which the server's
+        parser refuses; they would otherwise index the levels from the end.
+        """
+        if order_id in self._index or price <= 0 or (side != BUY and side != SELL):
+            return False
+        i = price - self._base
+        if not 0 <= i < self._span:
+            self._grow(price)
+            i = price - self._base
+        buy = side == BUY
+        free = self._free
+        if free:
+            slot = free.pop()
+            self._slot_id[slot] = order_id
+            self._slot_price[slot] = price
+            self._slot_qty[slot] = quantity
+            self._slot_buy[slot] = buy
+        else:
+            slot = len(self._slot_id)
+            self._slot_id.append(order_id)
+            self._slot_price.append(price)
+            self._slot_qty.append(quantity)
+            self._slot_buy.append(buy)
+        self._index[order_id] = slot
+        if buy:
+            self._bids[i].append(slot)
+            self._bid_live[i] += 1
+            if i > self._best_bid:
+                self._best_bid = i
+        else:
+            self._asks[i].append(slot)
+            self._ask_live[i] += 1
+            if i < self._best_ask:
+                self._best_ask = i
+        return True
+
+    def cancel_order(self, order_id: int) -> bool:
+        slot = self._index.pop(order_id, None)
+        if slot is None:
+            return False
+        self._slot_qty[slot] = 0
+        i = self._slot_price[slot] - self._base
+        if self._slot_buy[slot]:
+            self._bid_live[i] -= 1
+            if not self._bid_live[i]:
+                self._clear_level(self._bids[i])
+                if i == self._best_bid:
+                    self._step_bid()
+        else:
+            self._ask_live[i] -= 1
+            if not self._ask_live[i]:
+                self._clear_level(self._asks[i])
+                if i == self._best_ask:
+                    self._step_ask()
+        return True
+
+    def match(self, trade_callback: Optional[Callable[[int, int], None]] = None) -> List[Tuple[int, int]]:
+        """OrderBook::match: cross the book, returning (price, quantity) at the ask's price"""
+        trades = []
+        b, a, span = self._best_bid, self._best_ask, self._span
+        if b < 0 or a >= span or b < a:
+            return trades
+        qty, ids, index, free = self._slot_qty, self._slot_id, self._index, self._free
+        bids, asks = self._bids, self._asks
+        bid_live, ask_live = self._bid_live, self._ask_live
+        base, on_trade = self._base, self.on_trade
+        while b >= 0 and a < span and b >= a:
+            bid_level, ask_level = bids[b], asks[a]
+            # skip cancelled slots at the front of either FIFO
+            bid = bid_level[0]
+            while not qty[bid]:
+                free.append(bid_level.popleft())
+                bid = bid_level[0]
+            ask = ask_level[0]
+            while not qty[ask]:
+                free.append(ask_level.popleft())
+                ask = ask_level[0]
+            bid_qty, ask_qty = qty[bid], qty[ask]
+            quantity = bid_qty if bid_qty < ask_qty else ask_qty
+            price = base + a
+            trades.append((price, quantity))
+            if trade_callback:
+                trade_callback(price, quantity)
+            if on_trade:
+                on_trade(price, quantity)
+            qty[bid] = bid_qty = bid_qty - quantity
+            qty[ask] = ask_qty = ask_qty - quantity
+            if not bid_qty:
+                bid_level.popleft()
+                del index[ids[bid]]
+                free.append(bid)
+                bid_live[b] -= 1
+                if not bid_live[b]:
+                    free.extend(bid_level)
+                    bid_level.clear()
+                    b -= 1
+                    while b >= 0 and not bid_live[b]:
+                        b -= 1
+            if not ask_qty:
+                ask_level.popleft()
+                del index[ids[ask]]
+                free.append(ask)
+                ask_live[a] -= 1
+                if not ask_live[a]:
+                    free.extend(ask_level)
+                    ask_level.clear()
+                    a += 1
+                    while a < span and not ask_live[a]:
+                        a += 1
+        self._best_bid, self._best_ask = b, a
+        return trades
+
+    def submit(self, side: str, quantity: int, price: int) -> Tuple[int, List[Tuple[int, int]]]:
+        """What handleClientCommand does for "B"/"S": assign the next id, add, match
+
+        Orders the server refuses get no id; they come back as (0, []).
+        """
+        if quantity <= 0 or price <= 0:
+            return 0, []
+        self.next_id += 1
+        self.add_order(self.next_id, side, price, quantity)
+        return self.next_id, self.match()
+
+    def depth(self, side: str, levels: int = 10) -> List[Tuple[int, int, int]]:
+        """(price, quantity, order count) from the best price outwards"""
+        result = []
+        qty = self._slot_qty
+        if side == BUY:
+            book, live, indices = self._bids, self._bid_live, range(self._best_bid, -1, -1)
+        else:
+            book, live, indices = self._asks, self._ask_live, range(self._best_ask, self._span)
+        for i in indices:
+            if live[i]:
+                result.append((self._base + i, sum(qty[s] for s in book[i]), live[i]))
+                if len(result) == levels:
+                    break
+        return result
+
+    def _clear_level(self, level: deque):
+        # only cancelled slots are left once a level has no live orders
+        self._free.extend(level)
+        level.clear()
+
+    def _step_bid(self):
+        i = self._best_bid
+        live = self._bid_live
+        while i >= 0 and not live[i]:
+            i -= 1
+        self._best_bid = i
+
+    def _step_ask(self):
+        i = self._best_ask
+        live = self._ask_live
+        while i < self._span and not live[i]:
+            i += 1
+        self._best_ask = i
+
+    def _grow(self, price: int):
+        low = min(self._base, price)
+        high = max(self._base + self._span, price + 1)
+        # headroom on the side that grew, so a drifting price does not regrow every tick
+        if price < self._base:
+            low = max(1, low - self._span // 2)
+        else:
+            high += self._span // 2
+        span = high - low
+        if span > MAX_SPAN:
+            raise ValueError(f"price {price} is too far from the book's range to index densely")
+        front, back = self._base - low, high - (self._base + self._span)
+        self._bids = [deque() for _ in range(front)] + self._bids + [deque() for _ in range(back)]
+        self._asks = [deque() for _ in range(front)] + self._asks + [deque() for _ in range(back)]
+        self._bid_live = [0] * front + self._bid_live + [0] * back
+        self._ask_live = [0] * front + self._ask_live + [0] * back
+        self._best_bid += front if self._best_bid >= 0 else 0
+        self._best_ask = self._best_ask + front if self._best_ask < self._span else span
+        self._base, self._span = low, span
+
+
+@dataclass
+class ShadowStats:
+    predicted: int = 0
+    confirmed: int = 0
+    mismatched: int = 0
+    # server trades we did not predict, and predicted trades the server never sent
+    unexpected: int = 0
+    missed: int = 0
+
+    @property
+    def exact(self) -> bool:
+        return not (self.mismatched or self.unexpected or self.missed)
+
+
+class ShadowMatcher:
+    """Runs our acked orders through a local OrderBook and checks the server's trades against it
+
+    Acks are paired with sends in FIFO order, as OrderTracker does; the trades
+    the local book predicts for an order must be the ones that follow its ack.
+    Exact only while this connection is the book's sole participant.
+    """
+
+    def __init__(self, book: Optional[OrderBook] = None):
+        self.book = book or OrderBook()
+        self.stats = ShadowStats()
+        self._unacked: deque = deque()
+        self._expected: deque = deque()
+
+    def on_sent(self, side: str, quantity: int, price: int):
+        self._unacked.append((side, quantity, price))
+
+    def on_events(self, events: List[ServerEvent]):
+        stats = self.stats
+        for event in events:
+            kind = type(event)
+            if kind is AckEvent:
+                if self._expected:
+                    stats.missed += len(self._expected)
+                    self._expected.clear()
+                if not self._unacked:
+                    continue
+                side, quantity, price = self._unacked.popleft()
+                self.book.add_order(event.order_id, side, price, quantity)
+                trades = self.book.match()
+                stats.predicted += len(trades)
+                self._expected.extend(trades)
+            elif kind is TradeEvent:
+                if not self._expected:
+                    stats.unexpected += 1
+                elif self._expected.popleft() == (event.price, event.quantity):
+                    stats.confirmed += 1
+                else:
+                    stats.mismatched += 1
+            elif kind is CancelEvent:
+                self.book.cancel_order(event.order_id)
+            elif kind is RejectEvent:
+                if self._unacked:
+                    self._unacked.popleft()
@@ -1,9 +1,120 @@
 import asyncio
 import socket
-from dataclasses import dataclass
-from typing import Callable, Optional
+import struct
+import time
+from collections import deque
+from itertools import repeat
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, List, Optional, Tuple, Union
 from enum import Enum
 
+from .journal import RECEIVED, SENT, WireJournal
+from .latency import LatencyHistogram
+
+
+# Longest line the client can emit: "S <uint32> <uint32>\n" or "C <uint64>\n"
+MAX_ORDER_LINE = 24
+READ_CHUNK = 65536
+
+# ServerConfig.transport values
+STREAMS = "streams"
+PROTOCOL = "protocol"
+
+# ServerConfig.wire values
+WIRE_TEXT = "text"
+WIRE_BINARY = "binary"
+
+# Binary mode is asked for with a text line; servers without it reject that line
+BINARY_HELLO = b"BIN 1\n"
+BINARY_ACCEPT = b"Binary mode on"
+NEGOTIATE_TIMEOUT = 2.0
+# OrderHandler.h's WireFrame: type, 3 pad bytes, quantity, price, order id, little-endian
+FRAME = struct.Struct("<c3xIIQ")
+
+
+@dataclass(slots=True)
+class AckEvent:
+    order_id: int
+
+
+@dataclass(slots=True)
+class TradeEvent:
+    price: int
+    quantity: int
+
+
+@dataclass(slots=True)
+class CancelEvent:
+    order_id: int
+
+
+@dataclass(slots=True)
+class RejectEvent:
+    reason: str = "Invalid Order"
+
+
+@dataclass(slots=True)
+class NoticeEvent:
+    text: str
+
+
+ServerEvent = Union[AckEvent, TradeEvent, CancelEvent, RejectEvent, NoticeEvent]
+
+_REJECT = "Invalid Order"
+
+
+def parse_server_line(line: str, events: List[ServerEvent]):
+    """Parse one line of OrderHandler.h output, appending the resulting events"""
+    # "Invalid Order" is sent without a newline, so it arrives glued to the next line
+    while line.startswith(_REJECT):
+        events.append(RejectEvent())
+        line = line[len(_REJECT):]
+        if not line:
+            return
+    parts = line.split()
+    if not parts:
+        return
+    try:
+        if parts[0] == "Order" and len(parts) == 3:
+            if parts[2] == "placed.":
+                events.append(AckEvent(int(parts[1])))
+                return
+            if parts[2] == "canceled.":
+                events.append(CancelEvent(int(parts[1])))
+                return
+        elif parts[0] == "Trade" and len(parts) == 5:
+            # "Trade Executed: <price> x <qty>"
+            events.append(TradeEvent(int(parts[2]), int(parts[4])))
+            return
+    except ValueError:
+        pass
+    events.append(NoticeEvent(line))
+
+
+def parse_server_lines(lines: Iterable[str]) -> List[ServerEvent]:
+    events: List[ServerEvent] = []
+    for line in lines:
+        parse_server_line(line, events)
+    return events
+
+
+def decode_frames(buf) -> List[ServerEvent]:
+    """Events for a buffer of whole binary reply frames"""
+    events: List[ServerEvent] = []
+    append = events.append
+    for kind, quantity, price, order_id in FRAME.iter_unpack(buf):
+        if kind == b"A":
+            append(AckEvent(order_id))
+        elif kind == b"T":
+            append(TradeEvent(price, quantity))
+        elif kind == b"X":
+            append(CancelEvent(order_id))
+        elif kind == b"R":
+            append(RejectEvent())
+        else:
+            append(NoticeEvent(f"Unknown frame type {kind!r}"))
+    return events
+
 
 class ConnectionState(Enum):
     DISCONNECTED = "disconnected"
@@ -17,37 +128,175 @@ class ServerConfig:
     host: str = "127.0.0.1"
     port: int = 54321
     tcp_nodelay: bool = True
+    batch_size: int = 256
+    flush_interval: float = 0.001
+    max_in_flight: int = 8192
+    journal_path: Optional[str] = None
+    transport: str = STREAMS
+    # the transport pauses us above the high watermark and resumes below the low one
+    write_high_water: int = 256 * 1024
+    write_low_water: int = 64 * 1024
+    # WIRE_BINARY asks the server for fixed-size frames and falls back to text if refused
+    wire: str = WIRE_TEXT
+
+
+@dataclass
+class FlowStats:
+    """Write-side backpressure: what is queued now and how long sends have waited"""
+    queued_bytes: int = 0
+    in_flight: int = 0
+    bytes_in_flight: int = 0
+    # waiting on a full socket buffer
+    write_pauses: int = 0
+    write_blocked_ns: int = 0
+    # waiting on acks to reopen the max_in_flight window
+    window_pauses: int = 0
+    window_blocked_ns: int = 0
+
+    def merge(self, other: "FlowStats"):
+        self.queued_bytes += other.queued_bytes
+        self.in_flight += other.in_flight
+        self.bytes_in_flight += other.bytes_in_flight
+        self.write_pauses += other.write_pauses
+        self.write_blocked_ns += other.write_blocked_ns
+        self.window_pauses += other.window_pauses
+        self.window_blocked_ns += other.window_blocked_ns
+
+    def since(self, mark: "FlowStats") -> "FlowStats":
+        """Pauses and blocked time accumulated after `mark`; the current depths are kept"""
+        return replace(
+            self,
+            write_pauses=self.write_pauses - mark.write_pauses,
+            write_blocked_ns=self.write_blocked_ns - mark.write_blocked_ns,
+            window_pauses=self.window_pauses - mark.window_pauses,
+            window_blocked_ns=self.window_blocked_ns - mark.window_blocked_ns
+        )
 
 
 class AsyncTCPConnection:
+    """Order connection over asyncio streams; see transport.py for the Protocol-based one"""
+
     def __init__(self, config: ServerConfig):
         self.config = config
         self.reader: Optional[asyncio.StreamReader] = None
         self.writer: Optional[asyncio.StreamWriter] = None
         self.state = ConnectionState.DISCONNECTED
         self.on_message: Optional[Callable[[str], None]] = None
+        self.on_messages: Optional[Callable[[List[str]], None]] = None
+        self._subscribers: List[Callable[[List[ServerEvent]], None]] = []
         self.on_state_change: Optional[Callable[[ConnectionState], None]] = None
         self._receive_task: Optional[asyncio.Task] = None
-        self._buffer = ""
+        self._rx = bytearray()
+        self._out = bytearray(max(1, config.batch_size) * MAX_ORDER_LINE)
+        self._out_len = 0
+        self._out_count = 0
+        # cancels among the _out_count buffered messages
+        self._out_cancels = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+        self._window_open = asyncio.Event()
+        self._window_open.set()
+        # acks come back in send order on a socket, so a FIFO of send times is enough to pair them
+        self._send_times: deque = deque()
+        self.latency = LatencyHistogram()
+        # cancels are confirmed in order too, but timed apart from new orders
+        self._cancel_times: deque = deque()
+        self.cancel_latency = LatencyHistogram()
+        self.orders_sent = 0
+        self.cancels_sent = 0
+        self.bytes_sent = 0
+        self.writes = 0
+        self.bytes_received = 0
+        # client-side cost of each read: framing, parsing and subscriber callbacks
+        self.receive_time = LatencyHistogram()
+        self.flow = FlowStats()
+        self.acks_received = 0
+        self.trades_received = 0
+        self.cancels_received = 0
+        self.journal: Optional[WireJournal] = None
+        # true once the server has agreed to binary frames
+        self.binary = False
+        self._negotiating = False
+        self._negotiated = asyncio.Event()
 
     async def connect(self) -> bool:
         self._set_state(ConnectionState.CONNECTING)
+        self._send_times.clear()
+        self._cancel_times.clear()
+        self._in_flight = 0
+        self._rx.clear()
+        self.binary = False
         try:
-            self.reader, self.writer = await asyncio.open_connection(
-                self.config.host, self.config.port
+            await self._open_transport()
+            if self.config.journal_path and self.journal is None:
+                self.journal = WireJournal(self.config.journal_path)
+            self._write_transport().set_write_buffer_limits(
+                high=self.config.write_high_water, low=self.config.write_low_water
             )
             if self.config.tcp_nodelay:
                 sock = self.writer.get_extra_info('socket')
                 if sock:
                     sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self._set_state(ConnectionState.CONNECTED)
-            self._receive_task = asyncio.create_task(self._receive_loop())
+            self._start_receiving()
+            if self.config.wire == WIRE_BINARY:
+                await self._negotiate_binary()
             return True
         except Exception:
             self._set_state(ConnectionState.ERROR)
             return False
 
+    async def _negotiate_binary(self):
+        self._negotiating = True
+        self._negotiated.clear()
+        self._write(BINARY_HELLO)
+        try:
+            await asyncio.wait_for(self._negotiated.wait(), NEGOTIATE_TIMEOUT)
+        except asyncio.TimeoutError:
+            # the server may still switch later, so neither wire format is safe to use
+            await self._close_transport()
+            raise ConnectionError("No reply to binary mode request")
+
+    def _negotiate(self, data: bytes) -> bytes:
+        """Consume the reply to BINARY_HELLO; whatever follows it is returned"""
+        rx = self._rx
+        rx += data
+        reject = _REJECT.encode()
+        if rx.startswith(reject):
+            # an older server: stay on text
+            rest = bytes(rx[len(reject):])
+        else:
+            end = rx.find(b"\n")
+            if end < 0:
+                return b""
+            self.binary = rx[:end].strip() == BINARY_ACCEPT
+            rest = bytes(rx[end + 1:] if self.binary else rx)
+        rx.clear()
+        self._negotiating = False
+        self._negotiated.set()
+        return rest
+
     async def disconnect(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._out_len and self.is_connected:
+            self._flush_nowait()
+        await self._close_transport()
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        self._set_state(ConnectionState.DISCONNECTED)
+
+    async def _open_transport(self):
+        self.reader, self.writer = await asyncio.open_connection(
+            self.config.host, self.config.port
+        )
+
+    def _start_receiving(self):
+        self._receive_task = asyncio.create_task(self._receive_loop())
+
+    async def _close_transport(self):
         if self._receive_task:
             self._receive_task.cancel()
             try:
@@ -57,39 +306,413 @@ class AsyncTCPConnection:
         if self.writer:
             self.writer.close()
             try:
-                await self.writer.wait_closed()
+                await asyncio.wait_for(self.writer.wait_closed(), 1.0)
+            except asyncio.TimeoutError:
+                # a stalled peer would keep close() flushing forever
+                self.writer.transport.abort()
             except Exception:
                 pass
-        self._set_state(ConnectionState.DISCONNECTED)
+
+    async def _drain(self):
+        await self.writer.drain()
+
+    def _write_transport(self) -> asyncio.WriteTransport:
+        return self.writer.transport
+
+    def _write_paused(self) -> bool:
+        # streams keep their paused flag private; over the high watermark the transport has paused us
+        transport = self.writer.transport
+        return transport.is_closing() or transport.get_write_buffer_size() > self.config.write_high_water
+
+    async def _wait_writable(self):
+        """Block while the transport is over its high watermark, timing the wait"""
+        if not self._write_paused():
+            return
+        started = time.perf_counter_ns()
+        self.flow.write_pauses += 1
+        try:
+            await self._drain()
+        finally:
+            self.flow.write_blocked_ns += time.perf_counter_ns() - started
+
+    async def _wait_window(self, count: int = 1):
+        """Block until `count` more orders fit in the max_in_flight window"""
+        started = time.perf_counter_ns()
+        self.flow.window_pauses += 1
+        try:
+            while self._in_flight and self._in_flight + count > self.config.max_in_flight:
+                if self._out_len:
+                    self._flush_nowait()
+                self._window_open.clear()
+                await self._window_open.wait()
+                if not self.is_connected:
+                    return
+        finally:
+            self.flow.window_blocked_ns += time.perf_counter_ns() - started
+
+    def _write(self, payload: bytes):
+        self.writer.write(payload)
+        self.writes += 1
+        self.bytes_sent += len(payload)
+        if self.journal:
+            self.journal.record(SENT, payload)
+
+    def flow_stats(self) -> FlowStats:
+        queued = self._out_len
+        if self.writer and self.is_connected:
+            queued += self._write_transport().get_write_buffer_size()
+        messages = self.orders_sent + self.cancels_sent
+        per_order = self.bytes_sent / messages if messages else 0.0
+        return replace(
+            self.flow,
+            queued_bytes=queued,
+            in_flight=self._in_flight,
+            bytes_in_flight=int(self._in_flight * per_order)
+        )
 
     async def send_order(self, side: str, quantity: int, price: int) -> bool:
         if self.state != ConnectionState.CONNECTED or not self.writer:
             return False
         try:
-            message = f"{side} {quantity} {price}\n"
-            self.writer.write(message.encode())
-            await self.writer.drain()
+            if self.binary:
+                message = FRAME.pack(side.encode(), quantity, price, 0)
+            else:
+                message = f"{side} {quantity} {price}\n".encode()
+            self._write(message)
+            self._in_flight += 1
+            self.orders_sent += 1
+            self._send_times.append(time.perf_counter_ns())
+            await self._wait_writable()
             return True
-        except Exception:
+        except OSError:
             self._set_state(ConnectionState.ERROR)
             return False
 
+    async def send_cancel(self, order_id: int) -> bool:
+        """Cancel a resting order by the id its ack carried"""
+        if self.state != ConnectionState.CONNECTED or not self.writer:
+            return False
+        try:
+            if self.binary:
+                message = FRAME.pack(b"C", 0, 0, order_id)
+            else:
+                message = b"C %d\n" % order_id
+            self._write(message)
+            self._in_flight += 1
+            self.cancels_sent += 1
+            self._cancel_times.append(time.perf_counter_ns())
+            await self._wait_writable()
+            return True
+        except OSError:
+            self._set_state(ConnectionState.ERROR)
+            return False
+
+    async def send_orders(self, batch: Iterable[Tuple[str, int, int]]) -> int:
+        """Coalesce many orders into as few writes as possible, one drain at the end
+
+        Still bounded by max_in_flight: a full window flushes what is buffered
+        and waits for acks before appending more.
+        """
+        if self.state != ConnectionState.CONNECTED or not self.writer:
+            return 0
+        sent = 0
+        try:
+            for side, quantity, price in batch:
+                if self._in_flight >= self.config.max_in_flight:
+                    await self._wait_window()
+                    if not self.is_connected:
+                        return sent
+                self._append(side, quantity, price)
+                sent += 1
+                if self._out_count >= self.config.batch_size:
+                    self._flush_nowait()
+            self._flush_nowait()
+            await self._wait_writable()
+            return sent
+        except OSError:
+            self._set_state(ConnectionState.ERROR)
+            return sent
+
+    async def submit_order(self, side: str, quantity: int, price: int) -> bool:
+        """Pipelined send: buffer the order and flush on batch size or flush interval"""
+        if self.state != ConnectionState.CONNECTED or not self.writer:
+            return False
+        try:
+            if self._in_flight >= self.config.max_in_flight:
+                await self._wait_window()
+                if not self.is_connected:
+                    return False
+            self._append(side, quantity, price)
+            if self._out_count >= self.config.batch_size:
+                await self.flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(
+                    self.config.flush_interval, self._flush_nowait
+                )
+            return True
+        except OSError:
+            self._set_state(ConnectionState.ERROR)
+            return False
+
+    async def submit_cancel(self, order_id: int) -> bool:
+        """Pipelined cancel, buffered and flushed alongside submit_order()"""
+        if self.state != ConnectionState.CONNECTED or not self.writer:
+            return False
+        try:
+            if self._in_flight >= self.config.max_in_flight:
+                await self._wait_window()
+                if not self.is_connected:
+                    return False
+            self._append_cancel(order_id)
+            if self._out_count >= self.config.batch_size:
+                await self.flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(
+                    self.config.flush_interval, self._flush_nowait
+                )
+            return True
+        except OSError:
+            self._set_state(ConnectionState.ERROR)
+            return False
+
+    async def send_encoded(self, payload: bytes, count: int) -> bool:
+        """Write `count` pre-encoded orders in one go
+
+        Lines from OrderBatch.encode() on text connections, frames from
+        OrderBatch.encode_frames() once `binary` is set.
+        """
+        if self.state != ConnectionState.CONNECTED or not self.writer:
+            return False
+        try:
+            if self._in_flight and self._in_flight + count > self.config.max_in_flight:
+                await self._wait_window(count)
+                if not self.is_connected:
+                    return False
+            self._flush_nowait()
+            self._write(payload)
+            self._in_flight += count
+            self.orders_sent += count
+            self._send_times.extend(repeat(time.perf_counter_ns(), count))
+            await self._wait_writable()
+            return True
+        except OSError:
+            self._set_state(ConnectionState.ERROR)
+            return False
+
+    async def flush(self):
+        if not self.writer:
+            return
+        self._flush_nowait()
+        try:
+            if self._write_paused():
+                await self._wait_writable()
+            else:
+                # a full batch is on the wire: let the reader and the UI run before the next
+                await asyncio.sleep(0)
+        except OSError:
+            self._set_state(ConnectionState.ERROR)
+
+    def _append(self, side: str, quantity: int, price: int):
+        if self.binary:
+            start = self._out_len
+            if start + FRAME.size > len(self._out):
+                self._flush_nowait()
+                start = 0
+            FRAME.pack_into(self._out, start, side.encode(), quantity, price, 0)
+            self._out_len = start + FRAME.size
+        else:
+            line = b"%s %d %d\n" % (side.encode(), quantity, price)
+            end = self._out_len + len(line)
+            if end > len(self._out):
+                self._flush_nowait()
+                end = len(line)
+            self._out[end - len(line):end] = line
+            self._out_len = end
+        self._out_count += 1
+        self._in_flight += 1
+        self.orders_sent += 1
+
+    def _append_cancel(self, order_id: int):
+        if self.binary:
+            start = self._out_len
+            if start + FRAME.size > len(self._out):
+                self._flush_nowait()
+                start = 0
+            FRAME.pack_into(self._out, start, b"C", 0, 0, order_id)
+            self._out_len = start + FRAME.size
+        else:
+            line = b"C %d\n" % order_id
+            end = self._out_len + len(line)
+            if end > len(self._out):
+                self._flush_nowait()
+                end = len(line)
+            self._out[end - len(line):end] = line
+            self._out_len = end
+        self._out_count += 1
+        self._out_cancels += 1
+        self._in_flight += 1
+        self.cancels_sent += 1
+
+    def _flush_nowait(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._out_len or not self.writer:
+            return
+        # transports may keep a reference to what they are given, so hand over a copy
+        payload = bytes(memoryview(self._out)[:self._out_len])
+        self._write(payload)
+        # round trips start when the batch is written, not while it waits to fill
+        now = time.perf_counter_ns()
+        cancels = self._out_cancels
+        self._send_times.extend(repeat(now, self._out_count - cancels))
+        if cancels:
+            self._cancel_times.extend(repeat(now, cancels))
+        self._out_len = 0
+        self._out_count = 0
+        self._out_cancels = 0
+
+    def _on_ack(self):
+        self.acks_received += 1
+        if self._send_times:
+            self.latency.record(time.perf_counter_ns() - self._send_times.popleft())
+        self._release_slot()
+
+    def _on_reject(self):
+        # a rejected order never gets an ack, so retire its send time unmeasured
+        if self._send_times:
+            self._send_times.popleft()
+        self._release_slot()
+
+    def _on_cancel(self):
+        self.cancels_received += 1
+        if self._cancel_times:
+            self.cancel_latency.record(time.perf_counter_ns() - self._cancel_times.popleft())
+        self._release_slot()
+
+    def _release_slot(self):
+        if self._in_flight:
+            self._in_flight -= 1
+        if self._in_flight < self.config.max_in_flight:
+            self._window_open.set()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def pending_acks(self) -> int:
+        """Orders and cancels still waiting for the server's reply"""
+        return len(self._send_times) + len(self._cancel_times)
+
+    def _frame(self, data: bytes) -> List[str]:
+        """Split every complete line out of the receive buffer in one pass"""
+        rx = self._rx
+        if rx:
+            rx += data
+            buf = rx
+        else:
+            buf = data
+        end = buf.rfind(b"\n")
+        if end < 0:
+            if buf is data:
+                rx += data
+            return []
+        with memoryview(buf) as view:
+            text = str(view[:end], "utf-8")
+            if buf is data:
+                rx[:] = view[end + 1:]
+        if buf is rx:
+            del rx[:end + 1]
+        return [line for line in map(str.strip, text.split("\n")) if line]
+
+    def _frame_binary(self, data: bytes) -> List[ServerEvent]:
+        """Decode every whole frame in the receive buffer, keeping the partial tail"""
+        rx = self._rx
+        if rx:
+            rx += data
+            buf = rx
+        else:
+            buf = data
+        end = len(buf) - len(buf) % FRAME.size
+        if not end:
+            if buf is data:
+                rx += data
+            return []
+        with memoryview(buf) as view:
+            events = decode_frames(view[:end])
+            if buf is data:
+                rx[:] = view[end:]
+        if buf is rx:
+            del rx[:end]
+        return events
+
+    def subscribe(self, handler: Callable[[List[ServerEvent]], None]):
+        """Receive each batch of parsed server events"""
+        if handler not in self._subscribers:
+            self._subscribers.append(handler)
+
+    def unsubscribe(self, handler: Callable[[List[ServerEvent]], None]):
+        if handler in self._subscribers:
+            self._subscribers.remove(handler)
+
+    def _dispatch(self, lines: List[str]):
+        self._dispatch_events(parse_server_lines(lines))
+        batch_callback = self.on_messages
+        if batch_callback:
+            batch_callback(lines)
+            return
+        callback = self.on_message
+        if callback:
+            for line in lines:
+                callback(line)
+
+    def _dispatch_events(self, events: List[ServerEvent]):
+        for event in events:
+            kind = type(event)
+            if kind is AckEvent:
+                self._on_ack()
+            elif kind is TradeEvent:
+                self.trades_received += 1
+            elif kind is CancelEvent:
+                self._on_cancel()
+            elif kind is RejectEvent:
+                self._on_reject()
+        for handler in tuple(self._subscribers):
+            handler(events)
+
+    def _receive(self, data: bytes):
+        self.bytes_received += len(data)
+        if self.journal:
+            self.journal.record(RECEIVED, data)
+        if self._negotiating:
+            data = self._negotiate(data)
+            if not data:
+                return
+        if self.binary:
+            events = self._frame_binary(data)
+            if events:
+                self._dispatch_events(events)
+            return
+        lines = self._frame(data)
+        if lines:
+            self._dispatch(lines)
+
     async def _receive_loop(self):
         try:
             while self.state == ConnectionState.CONNECTED and self.reader:
-                data = await self.reader.read(4096)
+                data = await self.reader.read(READ_CHUNK)
                 if not data:
                     break
-                self._buffer += data.decode()
-                while '\n' in self._buffer:
-                    line, self._buffer = self._buffer.split('\n', 1)
-                    callback = self.on_message
-                    if line.strip() and callback:
-                        callback(line.strip())
+                started = time.perf_counter_ns()
+                self._receive(data)
+                self.receive_time.record(time.perf_counter_ns() - started)
         except asyncio.CancelledError:
             raise
         except Exception:
             self._set_state(ConnectionState.ERROR)
+        finally:
+            self._window_open.set()
 
     def _set_state(self, state: ConnectionState):
         self.state = state
@@ -1,9 +1,44 @@
+import heapq
 import random
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Iterator, Optional
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .connection import AckEvent, RejectEvent, ServerEvent
+from .lazy import lazy_import
+
+# batch generation is optional
+np = lazy_import("numpy")
+
+
+MIN_ORDERS_PER_SECOND = 1.0
+MAX_ORDERS_PER_SECOND = 100_000.0
+# market making moves its mid this often; seeded runs count it on a simulated
+# clock that advances 1 / orders_per_second per order
+DRIFT_SECONDS = 2.0
+
+
+@dataclass
+class CancelProfile:
+    """How a cancelling strategy treats the orders the server has acked"""
+    # share of acked orders that are later cancelled
+    cancel_ratio: float = 0.8
+    # share of those cancels followed by a replacement order
+    replace_ratio: float = 0.8
+    # mean seconds between an order's ack and its cancel
+    lifetime: float = 0.05
+
+
+CANCEL_PROFILES = {
+    # quotes that are moved rather than left to rest
+    "cancel_replace": CancelProfile(),
+    # short-lived orders pulled almost as soon as they rest
+    "cancel_heavy": CancelProfile(cancel_ratio=0.95, replace_ratio=0.0, lifetime=0.005),
+}
 
 
 class OrderSide(Enum):
@@ -23,15 +58,133 @@ class GeneratedOrder:
         return "BUY" if self.side == OrderSide.BUY else "SELL"
 
 
+@dataclass
+class GeneratedCancel:
+    order_id: int
+    timestamp: float
+
+
+@dataclass
+class OrderBatch:
+    """Columnar block of generated orders"""
+    side: "np.ndarray"       # S1: b"B" / b"S"
+    quantity: "np.ndarray"   # int64
+    price: "np.ndarray"      # int64
+    timestamp: "np.ndarray"  # float64
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    def rows(self) -> Iterator[Tuple[str, int, int]]:
+        """(side, quantity, price) tuples for AsyncTCPConnection.send_orders"""
+        return zip(
+            self.side.astype("U1").tolist(),
+            self.quantity.tolist(),
+            self.price.tolist()
+        )
+
+    def encode(self) -> bytes:
+        """The whole batch as wire-format order lines"""
+        return b"".join(
+            b"%s %d %d\n" % row
+            for row in zip(self.side.tolist(), self.quantity.tolist(), self.price.tolist())
+        )
+
+    def encode_frames(self) -> bytes:
+        """The whole batch as binary-mode frames (connection.FRAME), built without a Python loop"""
+        frames = np.zeros(len(self), dtype=_frame_dtype())
+        frames["kind"] = self.side
+        frames["quantity"] = self.quantity
+        frames["price"] = self.price
+        return frames.tobytes()
+
+    def orders(self) -> Iterator[GeneratedOrder]:
+        for side, quantity, price, timestamp in zip(
+            self.side.tolist(), self.quantity.tolist(), self.price.tolist(), self.timestamp.tolist()
+        ):
+            yield GeneratedOrder(
+                side=OrderSide.BUY if side == b"B" else OrderSide.SELL,
+                quantity=quantity,
+                price=price,
+                timestamp=timestamp
+            )
+
+    @classmethod
+    def from_orders(cls, orders: List[GeneratedOrder]) -> "OrderBatch":
+        return cls(
+            side=np.array([o.side.value.encode() for o in orders], dtype="S1"),
+            quantity=np.array([o.quantity for o in orders], dtype=np.int64),
+            price=np.array([o.price for o in orders], dtype=np.int64),
+            timestamp=np.array([o.timestamp for o in orders], dtype=np.float64)
+        )
+
+
+@lru_cache(maxsize=None)
+def _frame_dtype() -> "np.dtype":
+    # mirrors connection.FRAME: "<c3xIIQ"
+    return np.dtype([
+        ("kind", "S1"), ("pad", "V3"), ("quantity", "<u4"), ("price", "<u4"), ("order_id", "<u8")
+    ])
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Batch order generation requires numpy: pip install numpy")
+
+
+def _sides(is_buy: "np.ndarray") -> "np.ndarray":
+    return np.where(is_buy, b"B", b"S").astype("S1")
+
+
 class OrderStrategy(ABC):
+    seed: Optional[int] = None
+    # strategies that cancel their own orders are told the ids the server assigns
+    cancels = False
+
+    def reseed(self, seed: Optional[int]):
+        """Give the strategy its own random streams; the same seed replays the same orders"""
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed) if np is not None else None
+
     @abstractmethod
     def generate(self) -> GeneratedOrder:
         pass
 
+    def generate_batch(self, n: int) -> OrderBatch:
+        """Columnar equivalent of n generate() calls; strategies override with vectorized code"""
+        _require_numpy()
+        return OrderBatch.from_orders([self.generate() for _ in range(n)])
+
+    @property
+    def _rng(self) -> "np.random.Generator":
+        _require_numpy()
+        return self._np_rng
+
     @abstractmethod
     def name(self) -> str:
         pass
 
+    def set_rate(self, orders_per_second: float):
+        """The generator's rate changed; only strategies that model time care"""
+        pass
+
+    def on_sent(self, order: GeneratedOrder):
+        pass
+
+    def on_sent_batch(self, batch: OrderBatch):
+        pass
+
+    def due_cancels(self, limit: int) -> List[int]:
+        """Ids of up to `limit` acked orders this strategy now wants cancelled"""
+        return []
+
+    def on_ack(self, order_id: int):
+        pass
+
+    def on_reject(self):
+        pass
+
 
 class MarketMakingStrategy(OrderStrategy):
     """Generates orders around a mid-price with aggressive spread crossing"""
@@ -43,8 +196,11 @@ class MarketMakingStrategy(OrderStrategy):
         qty_min: int = 10,
         qty_max: int = 500,
         volatility: float = 0.02,
-        aggression_rate: int = 5
+        aggression_rate: int = 5,
+        seed: Optional[int] = None,
+        orders_per_second: float = 100.0
     ):
+        self.reseed(seed)
         self.mid_price = mid_price
         self.spread = spread
         self.qty_min = qty_min
@@ -53,12 +209,37 @@ class MarketMakingStrategy(OrderStrategy):
         self.aggression_rate = aggression_rate
         self._order_count = 0
         self._last_drift_time = time.time()
+        # wall-clock drift makes runs unrepeatable, so seeded runs drift on a
+        # simulated clock: as often per order as a live run at the same rate
+        self.simulated = seed is not None
+        self.orders_per_second = orders_per_second
+        # simulated seconds at _count_base, rebased whenever the rate changes
+        self._clock_base = 0.0
+        self._count_base = 0
+        self._drift_tick = 0
+
+    def set_rate(self, orders_per_second: float):
+        self._clock_base = self._clock(self._order_count)
+        self._count_base = self._order_count
+        self.orders_per_second = orders_per_second
+
+    def _clock(self, count):
+        """Simulated seconds once `count` orders have been generated (an int or an array)"""
+        return self._clock_base + (count - self._count_base) / self.orders_per_second
+
+    def _drift(self):
+        drift = self._random.gauss(0, self.mid_price * self.volatility)
+        self.mid_price = max(50, min(150, int(self.mid_price + drift)))
+        self._last_drift_time = time.time()
 
     def generate(self) -> GeneratedOrder:
-        if time.time() - self._last_drift_time > 2.0:
-            drift = random.gauss(0, self.mid_price * self.volatility)
-            self.mid_price = max(50, min(150, int(self.mid_price + drift)))
-            self._last_drift_time = time.time()
+        if self.simulated:
+            tick = int(self._clock(self._order_count + 1) // DRIFT_SECONDS)
+            if tick > self._drift_tick:
+                self._drift_tick = tick
+                self._drift()
+        elif time.time() - self._last_drift_time > DRIFT_SECONDS:
+            self._drift()
 
         side = OrderSide.BUY if self._order_count % 2 == 0 else OrderSide.SELL
         self._order_count += 1
@@ -67,16 +248,16 @@ class MarketMakingStrategy(OrderStrategy):
 
         if is_aggressive:
             if side == OrderSide.BUY:
-                price = self.mid_price + random.randint(1, 3)
+                price = self.mid_price + self._random.randint(1, 3)
             else:
-                price = self.mid_price - random.randint(1, 3)
+                price = self.mid_price - self._random.randint(1, 3)
         else:
             if side == OrderSide.BUY:
-                price = self.mid_price - random.randint(0, self.spread)
+                price = self.mid_price - self._random.randint(0, self.spread)
             else:
-                price = self.mid_price + random.randint(0, self.spread)
+                price = self.mid_price + self._random.randint(0, self.spread)
 
-        quantity = random.randint(self.qty_min, self.qty_max)
+        quantity = self._random.randint(self.qty_min, self.qty_max)
 
         return GeneratedOrder(
             side=side,
@@ -85,6 +266,43 @@ class MarketMakingStrategy(OrderStrategy):
             timestamp=time.time()
         )
 
+    def generate_batch(self, n: int) -> OrderBatch:
+        _require_numpy()
+        rng = self._rng
+        counts = self._order_count + np.arange(n, dtype=np.int64)
+        if self.simulated:
+            # as in generate(): order c drifts first if the simulated clock after
+            # it has entered a new DRIFT_SECONDS tick
+            ticks = (self._clock(counts + 1) // DRIFT_SECONDS).astype(np.int64)
+            drifts_before = np.cumsum(np.diff(ticks, prepend=self._drift_tick) > 0)
+            self._drift_tick = int(ticks[-1])
+            mids = [self.mid_price]
+            for _ in range(int(drifts_before[-1])):
+                drift = self._random.gauss(0, mids[-1] * self.volatility)
+                mids.append(max(50, min(150, int(mids[-1] + drift))))
+            self.mid_price = mids[-1]
+            mid = np.array(mids, dtype=np.int64)[drifts_before]
+        else:
+            if time.time() - self._last_drift_time > DRIFT_SECONDS:
+                self._drift()
+            mid = self.mid_price
+        self._order_count += n
+        is_buy = counts % 2 == 0
+        is_aggressive = (counts + 1) % self.aggression_rate == 0
+
+        sign = np.where(is_buy, 1, -1)
+        offset = np.where(
+            is_aggressive,
+            sign * rng.integers(1, 4, n),
+            -sign * rng.integers(0, self.spread + 1, n)
+        )
+        return OrderBatch(
+            side=_sides(is_buy),
+            quantity=rng.integers(self.qty_min, self.qty_max + 1, n),
+            price=mid + offset,
+            timestamp=np.full(n, time.time())
+        )
+
     def name(self) -> str:
         return "MARKET_MAKING"
 
@@ -92,12 +310,18 @@ class MarketMakingStrategy(OrderStrategy):
 class MomentumStrategy(OrderStrategy):
     """Generates orders following momentum with spread crossing"""
 
-    def __init__(self, base_price: int = 100, trend_strength: float = 0.6):
+    def __init__(
+        self,
+        base_price: int = 100,
+        trend_strength: float = 0.6,
+        seed: Optional[int] = None
+    ):
+        self.reseed(seed)
         self.current_price = base_price
         self.trend_strength = trend_strength
         self.trend_direction = 1
         self._steps_in_trend = 0
-        self._max_trend_steps = random.randint(10, 30)
+        self._max_trend_steps = self._random.randint(10, 30)
         self._order_count = 0
 
     def generate(self) -> GeneratedOrder:
@@ -107,9 +331,9 @@ class MomentumStrategy(OrderStrategy):
         if self._steps_in_trend >= self._max_trend_steps:
             self.trend_direction *= -1
             self._steps_in_trend = 0
-            self._max_trend_steps = random.randint(10, 30)
+            self._max_trend_steps = self._random.randint(10, 30)
 
-        if random.random() < self.trend_strength:
+        if self._random.random() < self.trend_strength:
             self.current_price += self.trend_direction
             self.current_price = max(50, min(150, self.current_price))
 
@@ -118,10 +342,10 @@ class MomentumStrategy(OrderStrategy):
         is_aggressive = (self._order_count % 4 == 0)
         if is_aggressive:
             side = OrderSide.SELL if side == OrderSide.BUY else OrderSide.BUY
-        elif random.random() < 0.2:
+        elif self._random.random() < 0.2:
             side = OrderSide.SELL if side == OrderSide.BUY else OrderSide.BUY
 
-        quantity = random.randint(50, 200)
+        quantity = self._random.randint(50, 200)
 
         return GeneratedOrder(
             side=side,
@@ -130,6 +354,62 @@ class MomentumStrategy(OrderStrategy):
             timestamp=time.time()
         )
 
+    def generate_batch(self, n: int) -> OrderBatch:
+        _require_numpy()
+        rng = self._rng
+
+        # split the batch into runs of constant trend direction (10-30 orders each)
+        lengths, directions, limits = [], [], []
+        remaining = n
+        while remaining > 0:
+            run = max(0, self._max_trend_steps - self._steps_in_trend - 1)
+            take = min(run, remaining)
+            if take:
+                lengths.append(take)
+                directions.append(self.trend_direction)
+                self._steps_in_trend += take
+                remaining -= take
+            if remaining:
+                self.trend_direction *= -1
+                self._steps_in_trend = 0
+                self._max_trend_steps = self._random.randint(10, 30)
+                lengths.append(1)
+                directions.append(self.trend_direction)
+                remaining -= 1
+        lengths_arr = np.array(lengths, dtype=np.int64)
+        dirs = np.repeat(np.array(directions, dtype=np.int64), lengths_arr)
+
+        moves = dirs * (rng.random(n) < self.trend_strength)
+        starts_idx = np.concatenate(([0], np.cumsum(lengths_arr)[:-1]))
+        totals = np.add.reduceat(moves, starts_idx).tolist()
+        # a run is monotone, so clamping its end is the same as clamping every step
+        run_start_prices = []
+        price = self.current_price
+        for total in totals:
+            run_start_prices.append(price)
+            price = max(50, min(150, price + total))
+        self.current_price = price
+
+        cumulative = np.cumsum(moves)
+        within_run = cumulative - np.repeat(cumulative[starts_idx] - moves[starts_idx], lengths_arr)
+        prices = np.clip(
+            np.repeat(np.array(run_start_prices, dtype=np.int64), lengths_arr) + within_run,
+            50, 150
+        )
+
+        counts = self._order_count + 1 + np.arange(n, dtype=np.int64)
+        self._order_count += n
+        is_aggressive = counts % 4 == 0
+        flip = is_aggressive | (rng.random(n) < 0.2)
+        is_buy = (dirs > 0) ^ flip
+
+        return OrderBatch(
+            side=_sides(is_buy),
+            quantity=rng.integers(50, 201, n),
+            price=prices,
+            timestamp=np.full(n, time.time())
+        )
+
     def name(self) -> str:
         return "MOMENTUM"
 
@@ -137,7 +417,8 @@ class MomentumStrategy(OrderStrategy):
 class ArbitrageStrategy(OrderStrategy):
     """Aggressive spread-crossing for maximum trade execution"""
 
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        self.reseed(seed)
         self.mid_price = 100
         self._index = 0
 
@@ -146,38 +427,173 @@ class ArbitrageStrategy(OrderStrategy):
         side = OrderSide.BUY if self._index % 2 == 0 else OrderSide.SELL
         
         if side == OrderSide.BUY:
-            price = self.mid_price + random.randint(0, 2)
+            price = self.mid_price + self._random.randint(0, 2)
         else:
-            price = self.mid_price - random.randint(0, 2)
+            price = self.mid_price - self._random.randint(0, 2)
         
         if self._index % 20 == 0:
-            self.mid_price += random.randint(-2, 2)
+            self.mid_price += self._random.randint(-2, 2)
             self.mid_price = max(90, min(110, self.mid_price))
 
         return GeneratedOrder(
             side=side,
-            quantity=random.randint(100, 500),
+            quantity=self._random.randint(100, 500),
             price=price,
             timestamp=time.time()
         )
 
+    def generate_batch(self, n: int) -> OrderBatch:
+        _require_numpy()
+        rng = self._rng
+        indices = self._index + 1 + np.arange(n, dtype=np.int64)
+        is_buy = indices % 2 == 0
+
+        # the mid moves after every 20th order, so order i prices off the mid
+        # left by the moves that happened before it
+        moves_before = (indices - 1) // 20 - self._index // 20
+        steps = rng.integers(-2, 3, int((self._index + n) // 20 - self._index // 20)).tolist()
+        mids = [self.mid_price]
+        for step in steps:
+            mids.append(max(90, min(110, mids[-1] + step)))
+        self.mid_price = mids[-1]
+        self._index += n
+
+        sign = np.where(is_buy, 1, -1)
+        prices = np.array(mids, dtype=np.int64)[moves_before] + sign * rng.integers(0, 3, n)
+        return OrderBatch(
+            side=_sides(is_buy),
+            quantity=rng.integers(100, 501, n),
+            price=prices,
+            timestamp=np.full(n, time.time())
+        )
+
     def name(self) -> str:
         return "ARBITRAGE"
 
 
+class CancelReplaceStrategy(MarketMakingStrategy):
+    """Market making that cancels, and optionally re-quotes, its resting orders
+
+    Each acked order is given a lifetime with probability cancel_ratio; once
+    that has passed, the next generate() cancels it instead of quoting, and
+    with probability replace_ratio a later call sends a replacement on the
+    same side, priced off the current mid. Orders that traded away in the
+    meantime are cancelled all the same, which covers the server's
+    unknown-id path as well as the delete path.
+
+    In batch mode due_cancels() hands out the expired ids and
+    generate_batch() puts queued replacements ahead of fresh quotes.
+    """
+    cancels = True
+
+    def __init__(self, profile: Optional[CancelProfile] = None, label: str = "CANCEL_REPLACE", **kwargs):
+        super().__init__(**kwargs)
+        self.profile = profile or CancelProfile()
+        self.label = label
+        # (side, quantity) of sent orders waiting for their ack
+        self._unacked: deque = deque()
+        # heap of (deadline, order id, side, quantity)
+        self._deadlines: List[Tuple[float, int, OrderSide, int]] = []
+        self._replacements: deque = deque()
+
+    @property
+    def resting(self) -> int:
+        """Acked orders still waiting to be cancelled"""
+        return len(self._deadlines)
+
+    def generate(self) -> Union[GeneratedOrder, GeneratedCancel]:
+        if self._replacements:
+            return self._replacements.popleft()
+        due = self.due_cancels(1)
+        if due:
+            return GeneratedCancel(due[0], time.time())
+        return super().generate()
+
+    def due_cancels(self, limit: int) -> List[int]:
+        deadlines = self._deadlines
+        now = time.monotonic()
+        due = []
+        while deadlines and len(due) < limit and deadlines[0][0] <= now:
+            _, order_id, side, quantity = heapq.heappop(deadlines)
+            if self._random.random() < self.profile.replace_ratio:
+                self._replacements.append(self._requote(side, quantity))
+            due.append(order_id)
+        return due
+
+    def _requote(self, side: OrderSide, quantity: int) -> GeneratedOrder:
+        offset = self._random.randint(0, self.spread)
+        price = self.mid_price - offset if side == OrderSide.BUY else self.mid_price + offset
+        return GeneratedOrder(side=side, quantity=quantity, price=price, timestamp=time.time())
+
+    def generate_batch(self, n: int) -> OrderBatch:
+        replacements = self._replacements
+        if not replacements:
+            return super().generate_batch(n)
+        _require_numpy()
+        requotes = OrderBatch.from_orders([replacements.popleft() for _ in range(min(n, len(replacements)))])
+        if len(requotes) == n:
+            return requotes
+        quotes = super().generate_batch(n - len(requotes))
+        return OrderBatch(
+            side=np.concatenate((requotes.side, quotes.side)),
+            quantity=np.concatenate((requotes.quantity, quotes.quantity)),
+            price=np.concatenate((requotes.price, quotes.price)),
+            timestamp=np.concatenate((requotes.timestamp, quotes.timestamp))
+        )
+
+    def on_sent(self, order: GeneratedOrder):
+        self._unacked.append((order.side, order.quantity))
+
+    def on_sent_batch(self, batch: OrderBatch):
+        self._unacked.extend(zip(
+            (OrderSide.BUY if side == b"B" else OrderSide.SELL for side in batch.side.tolist()),
+            batch.quantity.tolist()
+        ))
+
+    def on_ack(self, order_id: int):
+        if not self._unacked:
+            return
+        side, quantity = self._unacked.popleft()
+        profile = self.profile
+        if self._random.random() < profile.cancel_ratio:
+            deadline = time.monotonic() + self._random.expovariate(1.0) * profile.lifetime
+            heapq.heappush(self._deadlines, (deadline, order_id, side, quantity))
+
+    def on_reject(self):
+        if self._unacked:
+            self._unacked.popleft()
+
+    def name(self) -> str:
+        return self.label
+
+
 class OrderGenerator:
     """Main order generator that can switch between strategies"""
 
-    def __init__(self, orders_per_second: float = 100.0):
+    def __init__(self, orders_per_second: float = 100.0, seed: Optional[int] = None):
         self.orders_per_second = orders_per_second
+        self.seed = seed
+        # distinct but reproducible stream per strategy
+        seeds = [None] * 5 if seed is None else [seed + i for i in range(5)]
         self.strategies = {
-            "market_making": MarketMakingStrategy(),
-            "momentum": MomentumStrategy(),
-            "arbitrage": ArbitrageStrategy()
+            "market_making": MarketMakingStrategy(seed=seeds[0], orders_per_second=orders_per_second),
+            "momentum": MomentumStrategy(seed=seeds[1]),
+            "arbitrage": ArbitrageStrategy(seed=seeds[2]),
+            "cancel_replace": CancelReplaceStrategy(
+                replace(CANCEL_PROFILES["cancel_replace"]), "CANCEL_REPLACE", seed=seeds[3],
+                orders_per_second=orders_per_second
+            ),
+            "cancel_heavy": CancelReplaceStrategy(
+                replace(CANCEL_PROFILES["cancel_heavy"]), "CANCEL_HEAVY", seed=seeds[4],
+                orders_per_second=orders_per_second
+            ),
         }
         self.current_strategy_name = "market_making"
         self.total_generated = 0
         self.total_volume = 0
+        self.total_cancels = 0
+        # [strategy, order count] runs of sent orders, oldest first, for routing acks back
+        self._unacked: deque = deque()
         self._running = False
 
     @property
@@ -189,14 +605,71 @@ class OrderGenerator:
             self.current_strategy_name = name
 
     def set_rate(self, orders_per_second: float):
-        self.orders_per_second = max(1.0, min(1000.0, orders_per_second))
+        self.orders_per_second = max(MIN_ORDERS_PER_SECOND, min(MAX_ORDERS_PER_SECOND, orders_per_second))
+        for strategy in self.strategies.values():
+            strategy.set_rate(self.orders_per_second)
 
-    def generate_one(self) -> GeneratedOrder:
+    def generate_one(self) -> Union[GeneratedOrder, GeneratedCancel]:
         order = self.current_strategy.generate()
+        if type(order) is GeneratedCancel:
+            self.total_cancels += 1
+            return order
         self.total_generated += 1
         self.total_volume += order.quantity
         return order
 
+    def generate_cancels(self, limit: int) -> List[int]:
+        """Batch-mode cancels: ids the current strategy wants pulled, at most `limit`"""
+        ids = self.current_strategy.due_cancels(limit)
+        self.total_cancels += len(ids)
+        return ids
+
+    def on_sent(self, order: GeneratedOrder):
+        """Note a sent order so its ack reaches the strategy that made it"""
+        self.current_strategy.on_sent(order)
+        self._note_sent(1)
+
+    def on_sent_batch(self, batch: OrderBatch):
+        self.current_strategy.on_sent_batch(batch)
+        self._note_sent(len(batch))
+
+    def _note_sent(self, count: int):
+        strategy = self.current_strategy
+        unacked = self._unacked
+        if unacked and unacked[-1][0] is strategy:
+            unacked[-1][1] += count
+        else:
+            unacked.append([strategy, count])
+
+    def _pop_unacked(self) -> Optional[OrderStrategy]:
+        unacked = self._unacked
+        if not unacked:
+            return None
+        run = unacked[0]
+        run[1] -= 1
+        if not run[1]:
+            unacked.popleft()
+        return run[0]
+
+    def on_events(self, events: List[ServerEvent]):
+        """Pair acks and rejects with sent orders in FIFO order, as OrderTracker does"""
+        for event in events:
+            kind = type(event)
+            if kind is AckEvent:
+                strategy = self._pop_unacked()
+                if strategy is not None and strategy.cancels:
+                    strategy.on_ack(event.order_id)
+            elif kind is RejectEvent:
+                strategy = self._pop_unacked()
+                if strategy is not None:
+                    strategy.on_reject()
+
+    def generate_batch(self, n: int) -> OrderBatch:
+        batch = self.current_strategy.generate_batch(n)
+        self.total_generated += n
+        self.total_volume += int(batch.quantity.sum())
+        return batch
+
     @property
     def delay_between_orders(self) -> float:
         return 1.0 / self.orders_per_second
@@ -204,3 +677,4 @@ class OrderGenerator:
     def reset_stats(self):
         self.total_generated = 0
         self.total_volume = 0
+        self.total_cancels = 0
@@ -0,0 +1,464 @@
+import asyncio
+import time
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
+from .book import ShadowMatcher, ShadowStats
+from .connection import (
+    PROTOCOL, STREAMS, WIRE_BINARY, WIRE_TEXT, FlowStats, ServerConfig, ServerEvent, AckEvent, CancelEvent,
+    TradeEvent
+)
+from .generator import CANCEL_PROFILES, CancelProfile, GeneratedCancel, OrderGenerator
+from .latency import LatencyHistogram, format_ns
+from .metrics import MetricsExporter, MetricsRegistry, register_connection, register_generator
+from .pacing import Pacer
+from .pool import ConnectionPool, ConnectionStats
+from .replay import OrderRecorder, OrderReplayer
+from .transport import event_loop_name, install_uvloop
+
+
+@dataclass
+class HeadlessReport:
+    strategy: str
+    target_rate: float
+    transport: str = STREAMS
+    # negotiated in-process runs; multi-process reports show what was requested
+    wire: str = WIRE_TEXT
+    elapsed: float = 0.0
+    orders_sent: int = 0
+    volume: int = 0
+    acks: int = 0
+    trades: int = 0
+    cancels_sent: int = 0
+    cancels: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    cancel_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    flow: FlowStats = field(default_factory=FlowStats)
+    shadow: Optional[ShadowStats] = None
+    loop_lag: Optional[LatencyHistogram] = None
+    connections: List[ConnectionStats] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.orders_sent / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def cancel_rate(self) -> float:
+        return self.cancels_sent / self.elapsed if self.elapsed else 0.0
+
+
+class HeadlessRunner:
+    """Drives OrderGenerator strategies over AsyncTCPConnection without any UI"""
+
+    def __init__(
+        self,
+        config: ServerConfig,
+        strategy: str,
+        rate: float,
+        duration: float,
+        vectorized: bool = False,
+        seed: Optional[int] = None,
+        recorder: Optional[OrderRecorder] = None,
+        replayer: Optional[OrderReplayer] = None,
+        connections: int = 1,
+        shadow: bool = False,
+        metrics: Optional[MetricsExporter] = None,
+        cancel_profile: Optional[CancelProfile] = None
+    ):
+        if shadow and (connections > 1 or replayer):
+            raise ValueError("shadow matching needs a single connection and generated orders")
+        self.connection = ConnectionPool(config, connections)
+        self.shadow = ShadowMatcher() if shadow else None
+        self.generator = OrderGenerator(orders_per_second=rate, seed=seed)
+        self.generator.set_strategy(strategy)
+        if self.generator.current_strategy.cancels and not replayer:
+            # acks are paired with sends in order, which only holds on one socket
+            if connections > 1 or recorder:
+                raise ValueError("cancel strategies need a single connection and no recording")
+            if cancel_profile:
+                self.generator.current_strategy.profile = cancel_profile
+        self.pacer = Pacer(self.generator.orders_per_second)
+        self.duration = duration
+        self.vectorized = vectorized
+        self.recorder = recorder
+        self.replayer = replayer
+        # generate + encode + send for one pacer batch
+        self.tick_time = LatencyHistogram()
+        self.metrics = metrics
+        if metrics:
+            register_connection(metrics.registry, self.connection)
+            register_generator(metrics.registry, self.generator, self.pacer)
+            metrics.registry.histogram("tick_seconds", "Generating and sending one pacer batch", self.tick_time)
+        self.report = HeadlessReport(
+            strategy="REPLAY" if replayer else self.generator.current_strategy.name(),
+            target_rate=0.0 if replayer else self.generator.orders_per_second,
+            transport=config.transport
+        )
+
+    async def _generate(self, end: float):
+        recorder = self.recorder
+        shadow = self.shadow
+        tick_time = self.tick_time
+        self.pacer.reset()
+        while time.perf_counter() < end and self.connection.is_connected:
+            due = await self.pacer.acquire()
+            started = time.perf_counter_ns()
+            if self.vectorized:
+                # cancels go ahead of the batch; send_encoded flushes them first
+                cancels = 0
+                for order_id in self.generator.generate_cancels(due):
+                    if not await self.connection.submit_cancel(order_id):
+                        break
+                    cancels += 1
+                count = due - cancels
+                if not count:
+                    self.pacer.record(cancels)
+                    tick_time.record(time.perf_counter_ns() - started)
+                    continue
+                batch = self.generator.generate_batch(count)
+                payload = batch.encode_frames() if self.connection.binary else batch.encode()
+                if await self.connection.send_encoded(payload, count):
+                    self.pacer.record(due)
+                    self.generator.on_sent_batch(batch)
+                    if recorder:
+                        recorder.record_batch(batch)
+                    if shadow:
+                        for side, quantity, price in batch.rows():
+                            shadow.on_sent(side, quantity, price)
+                tick_time.record(time.perf_counter_ns() - started)
+                continue
+            sent = 0
+            for _ in range(due):
+                order = self.generator.generate_one()
+                if type(order) is GeneratedCancel:
+                    if not await self.connection.submit_cancel(order.order_id):
+                        break
+                    sent += 1
+                    continue
+                if not await self.connection.submit_order(
+                    order.side.value, order.quantity, order.price
+                ):
+                    break
+                self.generator.on_sent(order)
+                if recorder:
+                    recorder.record(order)
+                if shadow:
+                    shadow.on_sent(order.side.value, order.quantity, order.price)
+                sent += 1
+            self.pacer.record(sent)
+            tick_time.record(time.perf_counter_ns() - started)
+
+    def _handle_events(self, events: List[ServerEvent]):
+        for event in events:
+            kind = type(event)
+            if kind is AckEvent:
+                self.report.acks += 1
+            elif kind is TradeEvent:
+                self.report.trades += 1
+            elif kind is CancelEvent:
+                self.report.cancels += 1
+
+    async def run(self) -> HeadlessReport:
+        self.connection.subscribe(self._handle_events)
+        self.connection.subscribe(self.generator.on_events)
+        if self.shadow:
+            self.connection.subscribe(self.shadow.on_events)
+        if self.metrics:
+            try:
+                await self.metrics.start()
+            except OSError as e:
+                await self.metrics.stop()
+                raise ConnectionError(f"Metrics endpoint: {e}") from e
+        if not await self.connection.connect():
+            if self.metrics:
+                await self.metrics.stop()
+            raise ConnectionError(
+                f"Failed to connect to server at {self.connection.config.host}:{self.connection.config.port}"
+            )
+        self.report.wire = WIRE_BINARY if self.connection.binary else WIRE_TEXT
+
+        start = time.perf_counter()
+        try:
+            if self.replayer:
+                await self.replayer.play(self.connection)
+            else:
+                try:
+                    await asyncio.wait_for(self._generate(start + self.duration), self.duration)
+                except asyncio.TimeoutError:
+                    pass  # still paused on backpressure at the deadline
+            try:
+                await asyncio.wait_for(self.connection.flush(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            self.report.elapsed = time.perf_counter() - start
+            # give the tail of the pipeline a moment to be acknowledged
+            drain_deadline = time.perf_counter() + 1.0
+            while self.connection.pending_acks and time.perf_counter() < drain_deadline:
+                await asyncio.sleep(0.01)
+        finally:
+            if not self.report.elapsed:
+                self.report.elapsed = time.perf_counter() - start
+            if self.replayer:
+                self.report.orders_sent = self.replayer.sent
+                self.report.volume = self.replayer.volume
+            else:
+                self.report.orders_sent = self.generator.total_generated
+                self.report.volume = self.generator.total_volume
+                self.report.cancels_sent = self.generator.total_cancels
+            self.report.latency = self.connection.latency
+            self.report.cancel_latency = self.connection.cancel_latency
+            self.report.flow = self.connection.flow_stats()
+            self.report.connections = self.connection.stats()
+            self.connection.unsubscribe(self._handle_events)
+            self.connection.unsubscribe(self.generator.on_events)
+            if self.shadow:
+                self.connection.unsubscribe(self.shadow.on_events)
+                self.report.shadow = self.shadow.stats
+            if self.metrics:
+                self.report.loop_lag = self.metrics.probe.lag
+                await self.metrics.stop()
+            await self.connection.disconnect()
+
+        return self.report
+
+
+def format_report(report: HeadlessReport) -> str:
+    lines = ["=== Benchmark Results ==="]
+    lines.append(f"Strategy:    {report.strategy}")
+    lines.append(f"Transport:   {report.transport} ({event_loop_name()}), {report.wire} wire")
+    lines.append(f"Duration:    {report.elapsed:.2f} s")
+    lines.append(f"Orders Sent: {report.orders_sent:,}")
+    lines.append(f"Volume:      {report.volume:,}")
+    lines.append(f"Acks:        {report.acks:,}")
+    lines.append(f"Trades:      {report.trades:,}")
+    if report.cancels_sent:
+        lines.append(f"Cancels:     {report.cancels_sent:,} sent, {report.cancels:,} confirmed")
+    rate = f"{report.throughput:,.0f} orders/s"
+    if report.cancels_sent:
+        rate += f" + {report.cancel_rate:,.0f} cancels/s"
+    if report.target_rate:
+        # the pacer's target covers cancels as well as new orders
+        shortfall = max(0.0, 1.0 - (report.throughput + report.cancel_rate) / report.target_rate)
+        lines.append(f"Throughput:  {rate} (target {report.target_rate:,.0f}, -{shortfall:.1%})")
+    else:
+        lines.append(f"Throughput:  {rate}")
+
+    latency = report.latency
+    if latency.count:
+        p50, p99, p999 = latency.percentiles([0.5, 0.99, 0.999])
+        lines.append(f"Min Latency: {format_ns(latency.min_ns)}")
+        lines.append(f"Avg Latency: {format_ns(latency.mean_ns)}")
+        lines.append(f"P50 Latency: {format_ns(p50)}")
+        lines.append(f"P99 Latency: {format_ns(p99)}")
+        lines.append(f"P99.9:       {format_ns(p999)}")
+        lines.append(f"Max Latency: {format_ns(latency.max_ns)}")
+    else:
+        lines.append("Latency:     no acknowledgements received")
+
+    cancel_latency = report.cancel_latency
+    if cancel_latency.count:
+        p50, p99, p999 = cancel_latency.percentiles([0.5, 0.99, 0.999])
+        lines.append(
+            f"Cancel Lat:  p50 {format_ns(p50)}, p99 {format_ns(p99)}, "
+            f"p99.9 {format_ns(p999)}, max {format_ns(cancel_latency.max_ns)}"
+        )
+
+    flow = report.flow
+    if flow.write_pauses or flow.window_pauses:
+        lines.append(
+            f"Backpressure: socket full {flow.write_blocked_ns / 1e9:.2f} s ({flow.write_pauses:,} pauses), "
+            f"ack window {flow.window_blocked_ns / 1e9:.2f} s ({flow.window_pauses:,} pauses)"
+        )
+
+    lag = report.loop_lag
+    if lag is not None and lag.count:
+        p50, p99 = lag.percentiles([0.5, 0.99])
+        lines.append(
+            f"Loop Lag:    p50 {format_ns(p50)}, p99 {format_ns(p99)}, max {format_ns(lag.max_ns)}"
+        )
+
+    shadow = report.shadow
+    if shadow is not None:
+        verdict = "exact" if shadow.exact else "DIVERGED"
+        lines.append(
+            f"Shadow Book: {verdict} - {shadow.confirmed:,}/{shadow.predicted:,} predicted trades confirmed, "
+            f"{shadow.mismatched:,} mismatched, {shadow.unexpected:,} unexpected, {shadow.missed:,} missed"
+        )
+
+    if len(report.connections) > 1:
+        lines.append(f"Connections: {len(report.connections)}")
+        for stats in report.connections:
+            lines.append(
+                f"  #{stats.index:<3} sent {stats.orders_sent:>10,}  acks {stats.acks:>10,}  "
+                f"trades {stats.trades:>9,}  p50 {format_ns(stats.p50_ns):>9}  p99 {format_ns(stats.p99_ns):>9}"
+            )
+    return "\n".join(lines)
+
+
+def run_multiprocess(
+    workers: int,
+    config: ServerConfig,
+    strategy: str,
+    rate: float,
+    duration: float,
+    vectorized: bool = False,
+    seed: Optional[int] = None,
+    connections: int = 1,
+    cancel_profile: Optional[CancelProfile] = None
+) -> int:
+    from .multiproc import MultiProcessRunner
+
+    runner = MultiProcessRunner(
+        workers, config, strategy, rate, duration,
+        vectorized=vectorized, seed=seed, connections=connections, cancel_profile=cancel_profile
+    )
+    generator = OrderGenerator(orders_per_second=rate)
+    generator.set_strategy(strategy)
+    report = HeadlessReport(
+        strategy=generator.current_strategy.name(),
+        target_rate=generator.orders_per_second,
+        transport=config.transport,
+        wire=config.wire
+    )
+    print(f"Starting {workers} worker processes against {config.host}:{config.port}...")
+    start = time.perf_counter()
+
+    def progress(snapshot, latency):
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {elapsed:6.1f}s  sent {snapshot.orders_sent:>12,}  acks {snapshot.acks:>12,}  "
+            f"p99 {format_ns(latency.percentile(0.99))}"
+        )
+
+    runner.start()
+    try:
+        runner.join(on_tick=progress)
+    except KeyboardInterrupt:
+        runner.stop()
+    report.elapsed = min(time.perf_counter() - start, duration) if duration else 0.0
+    snapshot, report.latency = runner.stats.aggregate()
+    runner.close()
+
+    if snapshot.workers_failed == workers:
+        print(f"Failed to connect to server at {config.host}:{config.port}")
+        return 1
+    report.orders_sent = snapshot.orders_sent
+    report.volume = snapshot.volume
+    report.acks = snapshot.acks
+    report.trades = snapshot.trades
+    report.cancels_sent = snapshot.cancels_sent
+    report.cancels = snapshot.cancels
+    report.cancel_latency = snapshot.cancel_latency
+    print("Run complete.\n")
+    print(format_report(report))
+    print(f"Workers:     {workers} ({snapshot.workers_failed} failed to connect)")
+    return 0
+
+
+def run_headless(
+    host: str = "127.0.0.1",
+    port: int = 54321,
+    strategy: str = "market_making",
+    rate: float = 1000.0,
+    duration: float = 10.0,
+    vectorized: bool = False,
+    seed: Optional[int] = None,
+    record_path: Optional[str] = None,
+    replay_path: Optional[str] = None,
+    replay_speed: float = 1.0,
+    journal_path: Optional[str] = None,
+    connections: int = 1,
+    workers: int = 1,
+    transport: str = STREAMS,
+    write_high_water: Optional[int] = None,
+    shadow: bool = False,
+    wire: str = WIRE_TEXT,
+    metrics_port: Optional[int] = None,
+    metrics_json: Optional[str] = None,
+    metrics_interval: float = 1.0,
+    cancel_ratio: Optional[float] = None,
+    replace_ratio: Optional[float] = None,
+    order_lifetime: Optional[float] = None
+) -> int:
+    if transport == PROTOCOL:
+        install_uvloop()
+    cancel_profile = None
+    if strategy in CANCEL_PROFILES and not replay_path:
+        if connections > 1 or record_path:
+            print("Cancel strategies need a single connection per worker and no --record")
+            return 1
+        overrides = {
+            name: value for name, value in (
+                ("cancel_ratio", cancel_ratio), ("replace_ratio", replace_ratio), ("lifetime", order_lifetime)
+            ) if value is not None
+        }
+        cancel_profile = replace(CANCEL_PROFILES[strategy], **overrides)
+    limits = {}
+    if write_high_water:
+        limits = {"write_high_water": write_high_water, "write_low_water": write_high_water // 4}
+    exporting = metrics_port is not None or metrics_json
+    if workers > 1:
+        if exporting:
+            print("Metrics export needs a single worker process")
+            return 1
+        return run_multiprocess(
+            workers,
+            ServerConfig(host=host, port=port, transport=transport, wire=wire, **limits),
+            strategy,
+            rate,
+            duration,
+            vectorized=vectorized,
+            seed=seed,
+            connections=connections,
+            cancel_profile=cancel_profile
+        )
+
+    if shadow and (connections > 1 or replay_path):
+        print("--shadow needs a single connection and generated orders")
+        return 1
+    metrics = MetricsExporter(
+        MetricsRegistry(), port=metrics_port, json_path=metrics_json, interval=metrics_interval
+    ) if exporting else None
+    recorder = OrderRecorder(record_path) if record_path else None
+    replayer = OrderReplayer(replay_path, speed=replay_speed) if replay_path else None
+    runner = HeadlessRunner(
+        ServerConfig(
+            host=host, port=port, journal_path=journal_path, transport=transport, wire=wire, **limits
+        ),
+        strategy,
+        rate,
+        duration,
+        vectorized=vectorized,
+        seed=seed,
+        recorder=recorder,
+        replayer=replayer,
+        connections=connections,
+        shadow=shadow,
+        metrics=metrics,
+        cancel_profile=cancel_profile
+    )
+    if metrics_port is not None:
+        print(f"Serving metrics on http://127.0.0.1:{metrics_port}/metrics")
+    print(f"Connecting to server at {host}:{port}...")
+    try:
+        report = asyncio.run(runner.run())
+    except ConnectionError as e:
+        print(e)
+        return 1
+    except OSError as e:
+        print(e)
+        return 1
+    except KeyboardInterrupt:
+        report = runner.report
+    finally:
+        if recorder:
+            recorder.close()
+    print("Run complete.\n")
+    print(format_report(report))
+    if recorder:
+        print(f"Recorded {recorder.count:,} orders to {recorder.path}")
+    if metrics_json:
+        print(f"Metrics written to {metrics_json}")
+    if journal_path:
+        print(f"Wire journal written to {journal_path} (analyze with: --analyze-journal {journal_path})")
+    return 0
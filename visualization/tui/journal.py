@@ -0,0 +1,280 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .lazy import lazy_import
+
+# only the analysis side needs numpy
+np = lazy_import("numpy")
+
+
+JOURNAL_MAGIC = b"LOBJRN01"
+# monotonic ns timestamp, direction, payload length; the payload follows
+FRAME_HEADER = struct.Struct("<qBI")
+
+SENT = 0
+RECEIVED = 1
+
+
+class WireJournal:
+    """Length-prefixed binary log of everything sent and received on a connection
+
+    The event loop only timestamps and enqueues each chunk; a background
+    thread does the packing and file I/O.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.05):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.frames = 0
+        self.bytes = 0
+        self._pending: deque = deque()
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = open(path, "wb")
+        self._file.write(JOURNAL_MAGIC)
+        self._thread = threading.Thread(target=self._writer, name="lobster-journal", daemon=True)
+        self._thread.start()
+
+    def record(self, direction: int, data: bytes):
+        self._pending.append((time.monotonic_ns(), direction, data))
+
+    def _writer(self):
+        pending = self._pending
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if pending:
+                out = bytearray()
+                while pending:
+                    ts, direction, data = pending.popleft()
+                    out += FRAME_HEADER.pack(ts, direction, len(data))
+                    out += data
+                    self.frames += 1
+                self.bytes += len(out)
+                self._file.write(out)
+                self._file.flush()
+            if self._closed and not pending:
+                return
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+
+
+class JournalReader:
+    """Memory-mapped reader that turns a wire journal into NumPy arrays"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < len(JOURNAL_MAGIC):
+                raise ValueError(f"{path} is not a LOBSTER wire journal")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a LOBSTER wire journal")
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def frames(self) -> Iterator[Tuple[int, int, bytes]]:
+        """(timestamp_ns, direction, payload); a torn final frame is skipped"""
+        mm = self._mm
+        pos = len(JOURNAL_MAGIC)
+        end = len(mm)
+        header = FRAME_HEADER.size
+        while pos + header <= end:
+            ts, direction, length = FRAME_HEADER.unpack_from(mm, pos)
+            pos += header
+            if pos + length > end:
+                break
+            yield ts, direction, mm[pos:pos + length]
+            pos += length
+
+    def lines(self) -> Iterator[Tuple[int, int, str]]:
+        """Reassembled protocol lines, stamped with the frame that completed them"""
+        partial = {SENT: b"", RECEIVED: b""}
+        for ts, direction, payload in self.frames():
+            chunk = partial[direction] + payload
+            *complete, partial[direction] = chunk.split(b"\n")
+            for line in complete:
+                line = line.strip()
+                if line:
+                    yield ts, direction, line.decode(errors="replace")
+
+    def messages(self) -> Iterator[Tuple[int, int, Union[str, tuple]]]:
+        """Like lines(), but follows a switch to binary mode: frames come out as unpacked tuples"""
+        from .connection import BINARY_ACCEPT, BINARY_HELLO, FRAME
+
+        switch = {SENT: BINARY_HELLO.strip(), RECEIVED: BINARY_ACCEPT}
+        partial = {SENT: b"", RECEIVED: b""}
+        binary = {SENT: False, RECEIVED: False}
+        for ts, direction, payload in self.frames():
+            chunk = partial[direction] + payload
+            if not binary[direction]:
+                *complete, chunk = chunk.split(b"\n")
+                for i, line in enumerate(complete):
+                    line = line.strip()
+                    if line == switch[direction]:
+                        binary[direction] = True
+                        chunk = b"\n".join(complete[i + 1:] + [chunk])
+                        break
+                    if line:
+                        yield ts, direction, line.decode(errors="replace")
+            if binary[direction]:
+                end = len(chunk) - len(chunk) % FRAME.size
+                for frame in FRAME.iter_unpack(chunk[:end]):
+                    yield ts, direction, frame
+                chunk = chunk[end:]
+            partial[direction] = chunk
+
+    def analyze(self) -> Dict[str, "np.ndarray"]:
+        """Per-order send/ack times, round-trip latency, cancel timings and the trade tape as arrays"""
+        if np is None:
+            raise RuntimeError("Journal analysis requires numpy: pip install numpy")
+        from .connection import AckEvent, CancelEvent, RejectEvent, TradeEvent, parse_server_line
+
+        send_ts: List[int] = []
+        send_side: List[bytes] = []
+        send_qty: List[int] = []
+        send_price: List[int] = []
+        ack_ts: List[int] = []
+        ack_id: List[int] = []
+        trade_ts: List[int] = []
+        trade_price: List[int] = []
+        trade_qty: List[int] = []
+        cancel_ts: List[int] = []
+        confirm_ts: List[int] = []
+        events: list = []
+        rejects = 0
+
+        for ts, direction, line in self.messages():
+            if type(line) is tuple:
+                kind, quantity, price, order_id = line
+                if direction == SENT:
+                    if kind == b"B" or kind == b"S":
+                        send_ts.append(ts)
+                        send_side.append(kind)
+                        send_qty.append(quantity)
+                        send_price.append(price)
+                    elif kind == b"C":
+                        cancel_ts.append(ts)
+                elif kind == b"A":
+                    ack_ts.append(ts)
+                    ack_id.append(order_id)
+                elif kind == b"T":
+                    trade_ts.append(ts)
+                    trade_price.append(price)
+                    trade_qty.append(quantity)
+                elif kind == b"X":
+                    confirm_ts.append(ts)
+                elif kind == b"R":
+                    rejects += 1
+                continue
+            if direction == SENT:
+                parts = line.split()
+                if parts[0] in ("B", "S") and len(parts) == 3:
+                    send_ts.append(ts)
+                    send_side.append(parts[0].encode())
+                    send_qty.append(int(parts[1]))
+                    send_price.append(int(parts[2]))
+                elif parts[0] == "C" and len(parts) == 2:
+                    cancel_ts.append(ts)
+                continue
+            events.clear()
+            parse_server_line(line, events)
+            for event in events:
+                kind = type(event)
+                if kind is AckEvent:
+                    ack_ts.append(ts)
+                    ack_id.append(event.order_id)
+                elif kind is TradeEvent:
+                    trade_ts.append(ts)
+                    trade_price.append(event.price)
+                    trade_qty.append(event.quantity)
+                elif kind is CancelEvent:
+                    confirm_ts.append(ts)
+                elif kind is RejectEvent:
+                    rejects += 1
+
+        sends = np.array(send_ts, dtype=np.int64)
+        acks = np.array(ack_ts, dtype=np.int64)
+        # acks arrive in send order on a socket, so the i-th ack answers the i-th order
+        paired = min(len(sends), len(acks))
+        cancels = np.array(cancel_ts, dtype=np.int64)
+        confirms = np.array(confirm_ts, dtype=np.int64)
+        confirmed = min(len(cancels), len(confirms))
+        return {
+            "send_ts": sends,
+            "send_side": np.array(send_side, dtype="S1"),
+            "send_qty": np.array(send_qty, dtype=np.int64),
+            "send_price": np.array(send_price, dtype=np.int64),
+            "ack_ts": acks,
+            "ack_id": np.array(ack_id, dtype=np.int64),
+            "latency_ns": acks[:paired] - sends[:paired],
+            "trade_ts": np.array(trade_ts, dtype=np.int64),
+            "trade_price": np.array(trade_price, dtype=np.int64),
+            "trade_qty": np.array(trade_qty, dtype=np.int64),
+            "cancel_ts": cancels,
+            "confirm_ts": confirms,
+            "cancel_latency_ns": confirms[:confirmed] - cancels[:confirmed],
+            "rejects": np.array([rejects], dtype=np.int64),
+        }
+
+
+def summarize(path: str) -> str:
+    from .latency import format_ns
+
+    with JournalReader(path) as reader:
+        data = reader.analyze()
+    lines = [f"=== Journal: {path} ==="]
+    sends, trades = data["send_ts"], data["trade_ts"]
+    span = 0
+    stamps = [a for a in (sends, data["ack_ts"], trades, data["cancel_ts"], data["confirm_ts"]) if len(a)]
+    if stamps:
+        span = max(int(a[-1]) for a in stamps) - min(int(a[0]) for a in stamps)
+    lines.append(f"Span:        {span / 1e9:.2f} s")
+    lines.append(f"Orders Sent: {len(sends):,}")
+    lines.append(f"Acks:        {len(data['ack_ts']):,}")
+    lines.append(f"Rejects:     {int(data['rejects'][0]):,}")
+    lines.append(f"Trades:      {len(trades):,}")
+    sent_qty = int(data["send_qty"].sum())
+    traded_qty = int(data["trade_qty"].sum())
+    if sent_qty:
+        lines.append(f"Fill Ratio:  {traded_qty / sent_qty:.1%} ({traded_qty:,} / {sent_qty:,})")
+    if traded_qty:
+        vwap = float((data["trade_price"] * data["trade_qty"]).sum()) / traded_qty
+        lines.append(f"VWAP:        {vwap:.2f}")
+    latency = data["latency_ns"]
+    if len(latency):
+        p50, p99, p999 = np.percentile(latency, [50, 99, 99.9])
+        lines.append(f"P50 Latency: {format_ns(p50)}")
+        lines.append(f"P99 Latency: {format_ns(p99)}")
+        lines.append(f"P99.9:       {format_ns(p999)}")
+        lines.append(f"Max Latency: {format_ns(latency.max())}")
+    cancels = data["cancel_ts"]
+    if len(cancels):
+        lines.append(f"Cancels:     {len(cancels):,} sent, {len(data['confirm_ts']):,} confirmed")
+        cancel_latency = data["cancel_latency_ns"]
+        if len(cancel_latency):
+            p50, p99 = np.percentile(cancel_latency, [50, 99])
+            lines.append(
+                f"Cancel Lat:  p50 {format_ns(p50)}, p99 {format_ns(p99)}, max {format_ns(cancel_latency.max())}"
+            )
+    return "\n".join(lines)
+
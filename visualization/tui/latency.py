@@ -0,0 +1,142 @@
+from typing import List, Sequence
+
+
+class LatencyHistogram:
+    """Fixed-memory log-linear histogram of nanosecond latencies
+
+    Each power of two is split into 2**(sub_bits-1) linear sub-buckets, so a
+    recorded value is off by at most 1/2**(sub_bits-1) of itself (~3% at the
+    default). Percentile queries walk the buckets, never the samples.
+    """
+
+    def __init__(self, sub_bits: int = 5, max_value_ns: int = 1 << 36):
+        self.sub_bits = sub_bits
+        self._sub_count = 1 << sub_bits
+        self._half = self._sub_count >> 1
+        self.max_value_ns = max_value_ns
+        self._counts = [0] * (self._index(max_value_ns) + 1)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return shift * self._half + (value >> shift)
+
+    def _bucket_value(self, index: int) -> int:
+        if index < self._sub_count:
+            return index
+        shift = index // self._half - 1
+        top = index - shift * self._half
+        # midpoint of the bucket's range
+        return (top << shift) + ((1 << shift) >> 1)
+
+    def record(self, value_ns: int):
+        if value_ns < 0:
+            value_ns = 0
+        elif value_ns > self.max_value_ns:
+            value_ns = self.max_value_ns
+        self._counts[self._index(value_ns)] += 1
+        if self.count == 0 or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+        self.count += 1
+        self.total_ns += value_ns
+
+    def merge(self, other: "LatencyHistogram"):
+        self.merge_counts(other._counts, other.count, other.total_ns, other.min_ns, other.max_ns)
+
+    def merge_counts(
+        self,
+        counts: Sequence[int],
+        count: int,
+        total_ns: int,
+        min_ns: int,
+        max_ns: int
+    ):
+        """Fold in raw bucket counts from a histogram with the same layout"""
+        if count == 0:
+            return
+        for i, c in enumerate(counts):
+            if c:
+                self._counts[i] += c
+        self.min_ns = min_ns if self.count == 0 else min(self.min_ns, min_ns)
+        self.max_ns = max(self.max_ns, max_ns)
+        self.count += count
+        self.total_ns += total_ns
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram(self.sub_bits, self.max_value_ns)
+        clone.merge(self)
+        return clone
+
+    def since(self, mark: "LatencyHistogram") -> "LatencyHistogram":
+        """Samples recorded after `mark` was copied from this histogram
+
+        Min and max come from the remaining buckets, so they are as exact as
+        the percentiles.
+        """
+        if mark.count == 0:
+            return self.copy()
+        delta = LatencyHistogram(self.sub_bits, self.max_value_ns)
+        counts = [c - m for c, m in zip(self._counts, mark._counts)]
+        used = [i for i, c in enumerate(counts) if c]
+        if not used:
+            return delta
+        delta.merge_counts(
+            counts,
+            self.count - mark.count,
+            self.total_ns - mark.total_ns,
+            max(self.min_ns, self._bucket_value(used[0])),
+            min(self.max_ns, self._bucket_value(used[-1]))
+        )
+        return delta
+
+    @property
+    def counts(self) -> List[int]:
+        return self._counts
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentiles(self, quantiles: Sequence[float]) -> List[int]:
+        """Values at the given quantiles (0..1, ascending) in one pass over the buckets"""
+        results = [0] * len(quantiles)
+        if self.count == 0:
+            return results
+        targets = [max(1, int(q * self.count + 0.5)) for q in quantiles]
+        qi = 0
+        seen = 0
+        for index, c in enumerate(self._counts):
+            if not c:
+                continue
+            seen += c
+            while qi < len(targets) and seen >= targets[qi]:
+                results[qi] = min(self._bucket_value(index), self.max_ns)
+                qi += 1
+            if qi == len(targets):
+                break
+        return results
+
+    def percentile(self, quantile: float) -> int:
+        return self.percentiles([quantile])[0]
+
+
+def format_ns(value_ns: float) -> str:
+    if value_ns < 1_000:
+        return f"{value_ns:.0f} ns"
+    if value_ns < 1_000_000:
+        return f"{value_ns / 1_000:.1f} μs"
+    if value_ns < 1_000_000_000:
+        return f"{value_ns / 1_000_000:.2f} ms"
+    return f"{value_ns / 1_000_000_000:.2f} s"
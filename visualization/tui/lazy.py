@@ -0,0 +1,30 @@
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Iterable, List, Optional
+
+
+def lazy_import(name: str) -> Optional[ModuleType]:
+    """`name`, executed on first attribute access; None if it is not installed
+
+    The optional-dependency check costs a find_spec() instead of an import,
+    so a module can keep a module-level `np`/`uvloop` handle without paying
+    for it until a code path actually uses it.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def missing(names: Iterable[str]) -> List[str]:
+    """The named top-level packages that are not installed, found without importing them"""
+    return [name for name in names if importlib.util.find_spec(name) is None]
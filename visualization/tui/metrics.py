@@ -0,0 +1,321 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
+from .latency import LatencyHistogram
+
+
+COUNTER = "counter"
+GAUGE = "gauge"
+# histograms are exported as Prometheus summaries: quantiles, sum and count
+SUMMARY = "summary"
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+LAG_INTERVAL = 0.01
+
+
+class Counter:
+    """Monotonic count; hot paths bump .value directly"""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+Source = Union[Counter, Gauge, LatencyHistogram, Callable[[], Union[float, LatencyHistogram]]]
+
+
+@dataclass
+class _Metric:
+    name: str
+    kind: str
+    help: str
+    source: Source
+    # histogram values are ns, divided by this to export seconds
+    unit: float = 1.0
+
+    def read(self):
+        source = self.source
+        if isinstance(source, (Counter, Gauge)):
+            return source.value
+        if isinstance(source, LatencyHistogram):
+            return source
+        return source()
+
+
+def _format(value) -> str:
+    # full precision: :g keeps 6 digits, so large counters would look frozen
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+class MetricsRegistry:
+    """Named counters, gauges and histograms, read only when exported
+
+    Anything the client already counts is registered as a callback, so the
+    hot paths pay nothing extra for being observable.
+    """
+
+    def __init__(self, prefix: str = "lobster_"):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric):
+        metric.name = self.prefix + metric.name
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def counter(self, name: str, help: str, fn: Optional[Callable[[], float]] = None) -> Counter:
+        counter = Counter()
+        self._add(_Metric(name, COUNTER, help, fn or counter))
+        return counter
+
+    def gauge(self, name: str, help: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+        gauge = Gauge()
+        self._add(_Metric(name, GAUGE, help, fn or gauge))
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        source: Union[LatencyHistogram, Callable[[], LatencyHistogram], None] = None
+    ) -> Optional[LatencyHistogram]:
+        """Nanosecond histogram exported in seconds; a new one unless `source` is given"""
+        histogram = LatencyHistogram() if source is None else None
+        self._add(_Metric(name, SUMMARY, help, source or histogram, unit=1e9))
+        return histogram
+
+    def snapshot(self) -> Dict[str, Union[float, Dict[str, float]]]:
+        """Current values; histograms as count, sum, max and quantiles"""
+        result = {}
+        for metric in self._metrics.values():
+            value = metric.read()
+            if metric.kind == SUMMARY:
+                unit = metric.unit
+                quantiles = value.percentiles(QUANTILES)
+                value = {
+                    "count": value.count,
+                    "sum": value.total_ns / unit,
+                    "max": value.max_ns / unit,
+                    **{f"p{q * 100:g}": v / unit for q, v in zip(QUANTILES, quantiles)},
+                }
+            result[metric.name] = value
+        return result
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format, version 0.0.4"""
+        out: List[str] = []
+        for metric in self._metrics.values():
+            name = metric.name
+            out.append(f"# HELP {name} {metric.help}")
+            out.append(f"# TYPE {name} {metric.kind}")
+            value = metric.read()
+            if metric.kind != SUMMARY:
+                out.append(f"{name} {_format(value)}")
+                continue
+            unit = metric.unit
+            for q, v in zip(QUANTILES, value.percentiles(QUANTILES)):
+                out.append(f'{name}{{quantile="{q:g}"}} {_format(v / unit)}')
+            out.append(f"{name}_sum {_format(value.total_ns / unit)}")
+            out.append(f"{name}_count {value.count}")
+        out.append("")
+        return "\n".join(out)
+
+
+class LoopLagProbe:
+    """Sleeps for a fixed interval and records how late the event loop woke it
+
+    Lag means the client's own callbacks are hogging the loop; it is the
+    first thing to check before blaming the socket or the engine.
+    """
+
+    def __init__(self, interval: float = LAG_INTERVAL):
+        self.interval = interval
+        self.lag = LatencyHistogram()
+        self.last_ns = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, registry: MetricsRegistry):
+        registry.histogram("event_loop_lag_seconds", "How late the loop ran a timer", self.lag)
+        registry.gauge("event_loop_lag_last_seconds", "Most recent loop lag sample", lambda: self.last_ns / 1e9)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        interval_ns = int(self.interval * 1e9)
+        while True:
+            started = time.perf_counter_ns()
+            await asyncio.sleep(self.interval)
+            late = time.perf_counter_ns() - started - interval_ns
+            self.last_ns = late if late > 0 else 0
+            self.lag.record(self.last_ns)
+
+
+class MetricsExporter:
+    """Serves a registry over HTTP for Prometheus and/or dumps it to a JSON file
+
+    Also runs a LoopLagProbe, so every exported registry carries loop lag.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None,
+        json_path: Optional[str] = None,
+        interval: float = 1.0
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.json_path = json_path
+        self.interval = interval
+        self.probe = LoopLagProbe()
+        self.probe.register(registry)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._dump_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.probe.start()
+        if self.port is not None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        if self.json_path:
+            self._dump_task = asyncio.create_task(self._dump_loop())
+
+    async def stop(self):
+        if self._dump_task:
+            self._dump_task.cancel()
+            try:
+                await self._dump_task
+            except asyncio.CancelledError:
+                pass
+            self._dump_task = None
+        if self.json_path:
+            self.dump()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.probe.stop()
+
+    @property
+    def bound_port(self) -> Optional[int]:
+        """Listening port, useful when started on port 0"""
+        return self._server.sockets[0].getsockname()[1] if self._server else None
+
+    def dump(self):
+        """Write a snapshot to json_path, replacing the previous one atomically"""
+        tmp = f"{self.json_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"timestamp": time.time(), "metrics": self.registry.snapshot()}, f, indent=2)
+        os.replace(tmp, self.json_path)
+
+    async def _dump_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.dump()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5.0)
+            parts = request.split(b" ", 2)
+            path = parts[1].split(b"?")[0] if len(parts) > 1 else b""
+            if path in (b"/", b"/metrics"):
+                status = b"200 OK"
+                body = self.registry.render_prometheus().encode()
+            else:
+                status = b"404 Not Found"
+                body = b"not found\n"
+            writer.write(
+                b"HTTP/1.1 %s\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (status, len(body), body)
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+            pass
+        finally:
+            writer.close()
+
+
+def _merged(connections: list, attr: str) -> Callable[[], LatencyHistogram]:
+    def read() -> LatencyHistogram:
+        if len(connections) == 1:
+            return getattr(connections[0], attr)
+        merged = LatencyHistogram()
+        for conn in connections:
+            merged.merge(getattr(conn, attr))
+        return merged
+    return read
+
+
+def register_connection(registry: MetricsRegistry, connection):
+    """Socket-side metrics for an AsyncTCPConnection or a ConnectionPool"""
+    conns = list(getattr(connection, "connections", [connection]))
+
+    def total(attr: str) -> Callable[[], int]:
+        return lambda: sum(getattr(c, attr) for c in conns)
+
+    def flow(attr: str, unit: Optional[float] = None) -> Callable[[], float]:
+        if unit is None:
+            return lambda: sum(getattr(c.flow_stats(), attr) for c in conns)
+        return lambda: sum(getattr(c.flow_stats(), attr) for c in conns) / unit
+
+    registry.counter("orders_sent_total", "Orders written to the socket", total("orders_sent"))
+    registry.counter("bytes_sent_total", "Bytes handed to the transport", total("bytes_sent"))
+    registry.counter("writes_total", "Transport write calls", total("writes"))
+    registry.counter("bytes_received_total", "Bytes read from the socket", total("bytes_received"))
+    registry.counter("acks_received_total", "Order acknowledgements", total("acks_received"))
+    registry.counter("trades_received_total", "Trade reports", total("trades_received"))
+    registry.counter("cancels_sent_total", "Cancels written to the socket", total("cancels_sent"))
+    registry.counter("cancels_received_total", "Cancel confirmations", total("cancels_received"))
+    registry.gauge("in_flight_orders", "Orders and cancels sent but not yet answered", total("in_flight"))
+    registry.gauge("queued_bytes", "Bytes buffered in the client and the transport", flow("queued_bytes"))
+    registry.counter("write_pauses_total", "Sends that waited on a full socket buffer", flow("write_pauses"))
+    registry.counter(
+        "write_blocked_seconds_total", "Time sends waited on a full socket buffer", flow("write_blocked_ns", 1e9)
+    )
+    registry.counter("window_pauses_total", "Sends that waited on the ack window", flow("window_pauses"))
+    registry.counter(
+        "window_blocked_seconds_total", "Time sends waited on the ack window", flow("window_blocked_ns", 1e9)
+    )
+    registry.histogram("round_trip_seconds", "Order send to ack", _merged(conns, "latency"))
+    registry.histogram("cancel_round_trip_seconds", "Cancel send to confirmation", _merged(conns, "cancel_latency"))
+    registry.histogram(
+        "receive_seconds", "Client time spent framing, parsing and dispatching one read", _merged(conns, "receive_time")
+    )
+
+
+def register_generator(registry: MetricsRegistry, generator, pacer):
+    registry.counter("orders_generated_total", "Orders produced by the strategy", lambda: generator.total_generated)
+    registry.counter("volume_generated_total", "Quantity produced by the strategy", lambda: generator.total_volume)
+    registry.counter("cancels_generated_total", "Cancels produced by the strategy", lambda: generator.total_cancels)
+    registry.gauge("target_rate", "Orders per second the pacer aims for", lambda: pacer.rate)
+    registry.counter("pacer_dropped_total", "Orders skipped because the sender fell behind", lambda: pacer.dropped_total)
@@ -0,0 +1,258 @@
+import asyncio
+import multiprocessing as mp
+import time
+from array import array
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+from .connection import PROTOCOL, ServerConfig
+from .generator import CancelProfile
+from .latency import LatencyHistogram
+
+
+# int64 counters at the start of each worker's slot; order then cancel latency buckets follow
+ORDERS, VOLUME, ACKS, TRADES, LAT_COUNT, LAT_TOTAL, LAT_MIN, LAT_MAX, HEARTBEAT, DONE = range(10)
+CANCELS, CANCELED, CANCEL_COUNT, CANCEL_TOTAL, CANCEL_MIN, CANCEL_MAX = range(10, 16)
+HEADER_FIELDS = 16
+PUBLISH_INTERVAL = 0.1
+
+
+@dataclass
+class WorkerSnapshot:
+    orders_sent: int = 0
+    volume: int = 0
+    acks: int = 0
+    trades: int = 0
+    cancels_sent: int = 0
+    cancels: int = 0
+    cancel_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    workers_done: int = 0
+    workers_failed: int = 0
+
+
+class SharedStats:
+    """Per-worker counters and latency buckets in one shared-memory block
+
+    Each worker owns one slot and overwrites it in place, so the reader
+    aggregates without any pickling or per-event messages.
+    """
+
+    def __init__(self, workers: int, name: Optional[str] = None):
+        self.workers = workers
+        self.buckets = len(LatencyHistogram().counts)
+        self.slot_fields = HEADER_FIELDS + 2 * self.buckets
+        size = workers * self.slot_fields * 8
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+            self._shm.buf[:size] = bytes(size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._view = self._shm.buf.cast("q")
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def publish(
+        self,
+        index: int,
+        orders: int,
+        volume: int,
+        acks: int,
+        trades: int,
+        latency: LatencyHistogram,
+        done: int = 0,
+        cancels: int = 0,
+        canceled: int = 0,
+        cancel_latency: Optional[LatencyHistogram] = None
+    ):
+        base = index * self.slot_fields
+        view = self._view
+        buckets = base + HEADER_FIELDS + self.buckets
+        view[base + HEADER_FIELDS:buckets] = array("q", latency.counts)
+        if cancel_latency is not None:
+            view[buckets:base + self.slot_fields] = array("q", cancel_latency.counts)
+            view[base + CANCEL_COUNT] = cancel_latency.count
+            view[base + CANCEL_TOTAL] = cancel_latency.total_ns
+            view[base + CANCEL_MIN] = cancel_latency.min_ns
+            view[base + CANCEL_MAX] = cancel_latency.max_ns
+        view[base + CANCELS] = cancels
+        view[base + CANCELED] = canceled
+        view[base + ORDERS] = orders
+        view[base + VOLUME] = volume
+        view[base + ACKS] = acks
+        view[base + TRADES] = trades
+        view[base + LAT_COUNT] = latency.count
+        view[base + LAT_TOTAL] = latency.total_ns
+        view[base + LAT_MIN] = latency.min_ns
+        view[base + LAT_MAX] = latency.max_ns
+        view[base + HEARTBEAT] = time.monotonic_ns()
+        view[base + DONE] = done
+
+    def aggregate(self) -> Tuple[WorkerSnapshot, LatencyHistogram]:
+        view = self._view
+        snapshot = WorkerSnapshot()
+        latency = LatencyHistogram()
+        for index in range(self.workers):
+            base = index * self.slot_fields
+            snapshot.orders_sent += view[base + ORDERS]
+            snapshot.volume += view[base + VOLUME]
+            snapshot.acks += view[base + ACKS]
+            snapshot.trades += view[base + TRADES]
+            snapshot.cancels_sent += view[base + CANCELS]
+            snapshot.cancels += view[base + CANCELED]
+            done = view[base + DONE]
+            if done:
+                snapshot.workers_done += 1
+            if done < 0:
+                snapshot.workers_failed += 1
+            buckets = base + HEADER_FIELDS + self.buckets
+            latency.merge_counts(
+                view[base + HEADER_FIELDS:buckets],
+                view[base + LAT_COUNT],
+                view[base + LAT_TOTAL],
+                view[base + LAT_MIN],
+                view[base + LAT_MAX]
+            )
+            snapshot.cancel_latency.merge_counts(
+                view[buckets:base + self.slot_fields],
+                view[base + CANCEL_COUNT],
+                view[base + CANCEL_TOTAL],
+                view[base + CANCEL_MIN],
+                view[base + CANCEL_MAX]
+            )
+        return snapshot, latency
+
+    def close(self):
+        self._view.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _worker_main(
+    index: int,
+    shm_name: str,
+    workers: int,
+    config: ServerConfig,
+    strategy: str,
+    rate: float,
+    duration: float,
+    vectorized: bool,
+    seed: Optional[int],
+    connections: int,
+    cancel_profile: Optional[CancelProfile]
+):
+    from .headless import HeadlessRunner
+    from .transport import install_uvloop
+
+    if config.transport == PROTOCOL:
+        install_uvloop()
+
+    stats = SharedStats(workers, shm_name)
+    runner = HeadlessRunner(
+        config, strategy, rate, duration,
+        vectorized=vectorized, seed=seed, connections=connections, cancel_profile=cancel_profile
+    )
+
+    # DONE slot: 0 running, 1 finished, -1 could not connect
+    status = 1
+
+    def publish(done: int = 0):
+        stats.publish(
+            index,
+            runner.generator.total_generated,
+            runner.generator.total_volume,
+            runner.report.acks,
+            runner.report.trades,
+            runner.connection.latency,
+            done,
+            runner.generator.total_cancels,
+            runner.report.cancels,
+            runner.connection.cancel_latency
+        )
+
+    async def main():
+        nonlocal status
+        run = asyncio.create_task(runner.run())
+        while not run.done():
+            await asyncio.sleep(PUBLISH_INTERVAL)
+            publish()
+        try:
+            await run
+        except ConnectionError:
+            status = -1
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publish(done=status)
+        stats.close()
+
+
+class MultiProcessRunner:
+    """Runs one HeadlessRunner per process and aggregates them through SharedStats"""
+
+    def __init__(
+        self,
+        workers: int,
+        config: ServerConfig,
+        strategy: str,
+        rate: float,
+        duration: float,
+        vectorized: bool = False,
+        seed: Optional[int] = None,
+        connections: int = 1,
+        cancel_profile: Optional[CancelProfile] = None
+    ):
+        self.workers = workers
+        self.config = config
+        self.strategy = strategy
+        self.rate = rate
+        self.duration = duration
+        self.vectorized = vectorized
+        self.seed = seed
+        self.connections = connections
+        self.cancel_profile = cancel_profile
+        self.stats = SharedStats(workers)
+        self._processes: List[mp.Process] = []
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        for index in range(self.workers):
+            # each worker gets its own share of the rate and its own seed stream
+            seed = None if self.seed is None else self.seed + 1000 * index
+            process = ctx.Process(
+                target=_worker_main,
+                name=f"lobster-worker-{index}",
+                args=(
+                    index, self.stats.name, self.workers, self.config, self.strategy,
+                    self.rate / self.workers, self.duration, self.vectorized, seed, self.connections,
+                    self.cancel_profile
+                ),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def join(self, on_tick=None, interval: float = 1.0):
+        while any(p.is_alive() for p in self._processes):
+            for p in self._processes:
+                p.join(timeout=interval / len(self._processes))
+            if on_tick and any(p.is_alive() for p in self._processes):
+                on_tick(*self.stats.aggregate())
+
+    def stop(self):
+        for p in self._processes:
+            if p.is_alive():
+                p.terminate()
+        for p in self._processes:
+            p.join()
+
+    def close(self):
+        self.stats.close()
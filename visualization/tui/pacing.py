@@ -0,0 +1,90 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class PacingStats:
+    target_rate: float
+    achieved_rate: float
+    dropped: int
+
+    @property
+    def shortfall(self) -> float:
+        """Fraction of the target rate that was not achieved (0.0 = on target)"""
+        if self.target_rate <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.achieved_rate / self.target_rate)
+
+
+class Pacer:
+    """Token-bucket pacer with absolute deadlines and catch-up batching"""
+
+    def __init__(self, rate: float, burst_seconds: float = 0.05, max_batch: int = 4096):
+        self.rate = rate
+        self.burst_seconds = burst_seconds
+        self.max_batch = max_batch
+        self._tokens = 0.0
+        self._last_refill = time.perf_counter()
+        self._dropped = 0
+        self.dropped_total = 0
+        self._sent = 0
+        self._window_start = self._last_refill
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self.rate * self.burst_seconds)
+
+    def set_rate(self, rate: float):
+        if rate != self.rate:
+            self._refill(time.perf_counter())
+            self.rate = rate
+
+    def reset(self):
+        """Forget accrued tokens, e.g. after a pause"""
+        self._tokens = 0.0
+        self._last_refill = time.perf_counter()
+
+    def _refill(self, now: float):
+        # time lost to send/UI work is paid back as a bigger batch, up to one burst
+        self._tokens += (now - self._last_refill) * self.rate
+        self._last_refill = now
+        capacity = self.capacity
+        if self._tokens > capacity:
+            dropped = int(self._tokens - capacity)
+            self._dropped += dropped
+            self.dropped_total += dropped
+            self._tokens = capacity
+
+    async def acquire(self) -> int:
+        """Wait for the next deadline and return how many orders are due"""
+        now = time.perf_counter()
+        self._refill(now)
+        if self._tokens < 1.0:
+            deadline = now + (1.0 - self._tokens) / self.rate
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+            self._refill(time.perf_counter())
+        else:
+            # behind schedule there is no deadline to wait for, but the reader and
+            # the UI still need a turn of the loop between batches
+            await asyncio.sleep(0)
+        due = min(int(self._tokens), self.max_batch)
+        self._tokens -= due
+        return due
+
+    def record(self, sent: int):
+        self._sent += sent
+
+    def snapshot(self) -> PacingStats:
+        """Achieved vs target rate since the previous snapshot"""
+        now = time.perf_counter()
+        elapsed = max(now - self._window_start, 1e-9)
+        stats = PacingStats(
+            target_rate=self.rate,
+            achieved_rate=self._sent / elapsed,
+            dropped=self._dropped,
+        )
+        self._sent = 0
+        self._dropped = 0
+        self._window_start = now
+        return stats
@@ -0,0 +1,150 @@
+import asyncio
+import zlib
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .connection import AsyncTCPConnection, FlowStats, ServerConfig, ServerEvent
+from .latency import LatencyHistogram
+from .transport import create_connection
+
+
+ROUND_ROBIN = "round_robin"
+HASHED = "hashed"
+
+
+@dataclass
+class ConnectionStats:
+    index: int
+    connected: bool
+    orders_sent: int
+    acks: int
+    trades: int
+    in_flight: int
+    p50_ns: int
+    p99_ns: int
+
+
+class ConnectionPool:
+    """N connections to the same server with order flow sharded across them
+
+    Server.cpp runs one thread per client, so spreading flow over several
+    sockets exercises its multi-threaded path and the OrderBook::bookMutex
+    contention. Exposes the sending/subscribing surface of AsyncTCPConnection
+    so either can drive a load run.
+    """
+
+    def __init__(self, config: ServerConfig, size: int = 1, sharding: str = ROUND_ROBIN):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        if sharding not in (ROUND_ROBIN, HASHED):
+            raise ValueError(f"unknown sharding policy: {sharding}")
+        self.config = config
+        self.sharding = sharding
+        # journal each socket to its own file
+        self.connections = [
+            create_connection(
+                replace(config, journal_path=f"{config.journal_path}.{i}")
+                if config.journal_path and size > 1 else config
+            )
+            for i in range(size)
+        ]
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    async def connect(self) -> bool:
+        results = await asyncio.gather(*(c.connect() for c in self.connections))
+        if not all(results):
+            await self.disconnect()
+            return False
+        return True
+
+    async def disconnect(self):
+        await asyncio.gather(*(c.disconnect() for c in self.connections))
+
+    @property
+    def is_connected(self) -> bool:
+        return any(c.is_connected for c in self.connections)
+
+    def pick(self, key: Optional[str] = None) -> AsyncTCPConnection:
+        """Round-robin over live connections, or a stable connection per key when hashed"""
+        connections = self.connections
+        if self.sharding == HASHED and key is not None:
+            return connections[zlib.crc32(key.encode()) % len(connections)]
+        for _ in range(len(connections)):
+            conn = connections[self._next]
+            self._next = (self._next + 1) % len(connections)
+            if conn.is_connected:
+                return conn
+        return connections[0]
+
+    async def submit_order(self, side: str, quantity: int, price: int, key: Optional[str] = None) -> bool:
+        return await self.pick(key).submit_order(side, quantity, price)
+
+    async def send_orders(self, batch: Iterable[Tuple[str, int, int]], key: Optional[str] = None) -> int:
+        return await self.pick(key).send_orders(batch)
+
+    async def submit_cancel(self, order_id: int, key: Optional[str] = None) -> bool:
+        # Server.cpp shares one book between clients, so any socket can cancel any id
+        return await self.pick(key).submit_cancel(order_id)
+
+    async def send_encoded(self, payload: bytes, count: int, key: Optional[str] = None) -> bool:
+        return await self.pick(key).send_encoded(payload, count)
+
+    async def flush(self):
+        await asyncio.gather(*(c.flush() for c in self.connections if c.is_connected))
+
+    def subscribe(self, handler: Callable[[List[ServerEvent]], None]):
+        for conn in self.connections:
+            conn.subscribe(handler)
+
+    def unsubscribe(self, handler: Callable[[List[ServerEvent]], None]):
+        for conn in self.connections:
+            conn.unsubscribe(handler)
+
+    @property
+    def binary(self) -> bool:
+        """Whether every connection negotiated binary frames"""
+        return all(c.binary for c in self.connections)
+
+    @property
+    def pending_acks(self) -> int:
+        return sum(c.pending_acks for c in self.connections)
+
+    @property
+    def latency(self) -> LatencyHistogram:
+        """Aggregate round-trip histogram across all connections"""
+        merged = LatencyHistogram()
+        for conn in self.connections:
+            merged.merge(conn.latency)
+        return merged
+
+    @property
+    def cancel_latency(self) -> LatencyHistogram:
+        merged = LatencyHistogram()
+        for conn in self.connections:
+            merged.merge(conn.cancel_latency)
+        return merged
+
+    def flow_stats(self) -> FlowStats:
+        merged = FlowStats()
+        for conn in self.connections:
+            merged.merge(conn.flow_stats())
+        return merged
+
+    def stats(self) -> List[ConnectionStats]:
+        result = []
+        for i, conn in enumerate(self.connections):
+            p50, p99 = conn.latency.percentiles([0.5, 0.99])
+            result.append(ConnectionStats(
+                index=i,
+                connected=conn.is_connected,
+                orders_sent=conn.orders_sent,
+                acks=conn.acks_received,
+                trades=conn.trades_received,
+                in_flight=conn.in_flight,
+                p50_ns=p50,
+                p99_ns=p99
+            ))
+        return result
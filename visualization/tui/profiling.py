@@ -0,0 +1,176 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import CodeType
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_INTERVAL = 0.005
+TOP_N = 25
+# traceback depth kept per allocation; deeper is slower
+MEMORY_FRAMES = 16
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack from a background thread
+
+    Nothing is hooked into the profiled code: every interval the sampler
+    reads the thread's current frame chain via sys._current_frames(), so the
+    cost is one stack walk per sample rather than a callback per call. Run
+    on the event loop's thread, the samples cover whichever coroutine or
+    callback the loop is executing, and idle time shows up as the selector.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        # root-first tuples of code objects; labels are only built when writing out
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._labels: Dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self):
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="lobster-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed += time.perf_counter() - self._started
+
+    def _run(self):
+        current_frames = sys._current_frames
+        stacks = self.stacks
+        target = self.thread_id
+        while not self._stop.wait(self.interval):
+            frame = current_frames().get(target)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                stacks[tuple(stack)] += 1
+                self.samples += 1
+
+    def label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename.replace(os.sep, "/")
+            short = "/".join(path.rsplit("/", 2)[-2:])
+            name = getattr(code, "co_qualname", code.co_name)
+            # ';' separates frames in collapsed output
+            label = self._labels[code] = f"{name} ({short}:{code.co_firstlineno})".replace(";", ":")
+        return label
+
+    def collapsed(self) -> List[str]:
+        """One "frame;frame;frame count" line per distinct stack, for flamegraph.pl or speedscope"""
+        label = self.label
+        return [
+            f"{';'.join(label(code) for code in stack)} {count}"
+            for stack, count in self.stacks.most_common()
+        ]
+
+    def top(self, n: int = TOP_N) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+        """(self, cumulative) sample counts for the n busiest functions"""
+        # by label, so e.g. every dataclass __init__ adds up under one name
+        label = self.label
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[label(stack[-1])] += count
+            for name in {label(code) for code in stack}:
+                total[name] += count
+        return own.most_common(n), total.most_common(n)
+
+
+class Profiler:
+    """--profile: stack sampling plus optional tracemalloc, written out on exit
+
+    Writes <prefix>.collapsed (flamegraph-ready stacks) and <prefix>.txt
+    (busiest functions and, with memory tracking, the top allocators).
+    """
+
+    def __init__(self, prefix: str, interval: float = DEFAULT_INTERVAL, memory: bool = False):
+        self.prefix = prefix
+        self.memory = memory
+        self.sampler = SamplingProfiler(interval)
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_bytes = 0
+
+    def __enter__(self) -> "Profiler":
+        if self.memory:
+            tracemalloc.start(MEMORY_FRAMES)
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.sampler.stop()
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ))
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        collapsed, report = self.write()
+        print(f"Profile: {self.sampler.samples:,} samples over {self.sampler.elapsed:.1f} s")
+        print(f"  stacks:  {collapsed}")
+        print(f"  report:  {report}")
+        return False
+
+    def write(self) -> Tuple[str, str]:
+        collapsed_path = f"{self.prefix}.collapsed"
+        report_path = f"{self.prefix}.txt"
+        with open(collapsed_path, "w") as f:
+            for line in self.sampler.collapsed():
+                f.write(line + "\n")
+        with open(report_path, "w") as f:
+            f.write(self.report())
+        return collapsed_path, report_path
+
+    def report(self) -> str:
+        sampler = self.sampler
+        samples = max(1, sampler.samples)
+        own, total = sampler.top()
+        lines = [
+            "=== Profile ===",
+            f"Samples:     {sampler.samples:,} every {sampler.interval * 1000:g} ms over {sampler.elapsed:.2f} s",
+            "",
+            "Self time (where the thread actually was):",
+        ]
+        lines.extend(f"  {count / samples:6.1%}  {count:>8,}  {name}" for name, count in own)
+        lines.append("")
+        lines.append("Cumulative (on the stack):")
+        lines.extend(f"  {count / samples:6.1%}  {count:>8,}  {name}" for name, count in total)
+        if self.snapshot is not None:
+            stats = self.snapshot.statistics("lineno")
+            live = sum(stat.size for stat in stats)
+            lines.append("")
+            lines.append(f"Top allocators (live at exit {live / 1024:,.0f} KiB, peak {self.peak_bytes / 1024:,.0f} KiB):")
+            for stat in stats[:TOP_N]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"  {stat.size / 1024:10,.1f} KiB  {stat.count:>9,} blocks  {frame.filename}:{frame.lineno}"
+                )
+            lines.append("")
+            lines.append("Largest allocation sites with call stacks:")
+            for stat in self.snapshot.statistics("traceback")[:5]:
+                lines.append(f"  {stat.size / 1024:,.1f} KiB in {stat.count:,} blocks")
+                lines.extend(f"    {line}" for line in stat.traceback.format(most_recent_first=True))
+        lines.append("")
+        return "\n".join(lines)
@@ -0,0 +1,120 @@
+from collections import deque
+from typing import Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from .connection import AckEvent, CancelEvent, RejectEvent, ServerEvent, TradeEvent
+from .generator import GeneratedOrder, OrderSide
+
+
+RENDER_FPS = 30.0
+
+T = TypeVar("T")
+
+
+class FrameBuffer(Generic[T]):
+    """Ring buffer of items waiting for the next frame; overflow is folded into a summary"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ring: deque = deque()
+        self.suppressed = 0
+
+    def push(self, item: T):
+        ring = self._ring
+        if len(ring) >= self.capacity:
+            self._suppress(ring.popleft())
+        ring.append(item)
+
+    def extend(self, items: Iterable[T]):
+        for item in items:
+            self.push(item)
+
+    def drain(self) -> Tuple[List[T], Optional[str]]:
+        """Items to draw this frame and a summary of what was skipped, if anything"""
+        items = list(self._ring)
+        self._ring.clear()
+        summary = self.summary() if self.suppressed else None
+        self._reset_summary()
+        return items, summary
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def _suppress(self, item: T):
+        self.suppressed += 1
+
+    def summary(self) -> str:
+        return f"+{self.suppressed:,} suppressed"
+
+    def _reset_summary(self):
+        self.suppressed = 0
+
+
+class TapeFrameBuffer(FrameBuffer[ServerEvent]):
+    def __init__(self, capacity: int = 64):
+        super().__init__(capacity)
+        self._reset_summary()
+
+    def _suppress(self, event: ServerEvent):
+        self.suppressed += 1
+        kind = type(event)
+        if kind is TradeEvent:
+            self.trades += 1
+            self.trade_qty += event.quantity
+            self.notional += event.price * event.quantity
+        elif kind is AckEvent:
+            self.acks += 1
+        elif kind is CancelEvent:
+            self.cancels += 1
+        elif kind is RejectEvent:
+            self.rejects += 1
+
+    def summary(self) -> str:
+        parts = []
+        if self.trades:
+            parts.append(
+                f"+{self.trades:,} trades suppressed, VWAP {self.notional / self.trade_qty:.1f}"
+            )
+        for count, label in (
+            (self.acks, "acks"),
+            (self.cancels, "cancels"),
+            (self.rejects, "rejects"),
+        ):
+            if count:
+                parts.append(f"+{count:,} {label}")
+        other = self.suppressed - self.trades - self.acks - self.cancels - self.rejects
+        if other:
+            parts.append(f"+{other:,} messages")
+        return " · ".join(parts)
+
+    def _reset_summary(self):
+        self.suppressed = 0
+        self.trades = 0
+        self.trade_qty = 0
+        self.notional = 0
+        self.acks = 0
+        self.cancels = 0
+        self.rejects = 0
+
+
+class OrderFrameBuffer(FrameBuffer[GeneratedOrder]):
+    def __init__(self, capacity: int = 32):
+        super().__init__(capacity)
+        self._reset_summary()
+
+    def _suppress(self, order: GeneratedOrder):
+        self.suppressed += 1
+        if order.side == OrderSide.BUY:
+            self.buys += 1
+        self.volume += order.quantity
+
+    def summary(self) -> str:
+        sells = self.suppressed - self.buys
+        return (
+            f"+{self.suppressed:,} orders suppressed "
+            f"({self.buys:,} B / {sells:,} S, vol {self.volume:,})"
+        )
+
+    def _reset_summary(self):
+        self.suppressed = 0
+        self.buys = 0
+        self.volume = 0
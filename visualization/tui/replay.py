@@ -0,0 +1,106 @@
+import asyncio
+import struct
+import time
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from .connection import AsyncTCPConnection
+from .generator import GeneratedOrder, OrderBatch
+
+
+RECORD_MAGIC = b"LOBREC01"
+# offset_ns since the first recorded order, quantity, price, side byte (b"B"/b"S"), padding
+ORDER_RECORD = struct.Struct("<qIIc3x")
+
+RecordedOrder = Tuple[int, str, int, int]
+
+
+class OrderRecorder:
+    """Writes generated orders to a fixed-width binary file for later replay"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: BinaryIO = open(path, "wb", buffering=1 << 16)
+        self._file.write(RECORD_MAGIC)
+        self._start_ns: Optional[int] = None
+        self.count = 0
+
+    def _offset(self) -> int:
+        now = time.perf_counter_ns()
+        if self._start_ns is None:
+            self._start_ns = now
+        return now - self._start_ns
+
+    def record(self, order: GeneratedOrder):
+        self._file.write(ORDER_RECORD.pack(
+            self._offset(), order.quantity, order.price, order.side.value.encode()
+        ))
+        self.count += 1
+
+    def record_batch(self, batch: OrderBatch):
+        offset = self._offset()
+        buf = bytearray(ORDER_RECORD.size * len(batch))
+        for i, (side, quantity, price) in enumerate(zip(
+            batch.side.tolist(), batch.quantity.tolist(), batch.price.tolist()
+        )):
+            ORDER_RECORD.pack_into(buf, i * ORDER_RECORD.size, offset, quantity, price, side)
+        self._file.write(buf)
+        self.count += len(batch)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OrderReplayer:
+    """Plays a recorded order stream back at 1x, Nx or maximum speed (speed <= 0)"""
+
+    def __init__(self, path: str, speed: float = 1.0, chunk: int = 4096):
+        self.path = path
+        self.speed = speed
+        self.chunk = chunk
+        self.sent = 0
+        self.volume = 0
+
+    def __iter__(self) -> Iterator[RecordedOrder]:
+        with open(self.path, "rb") as f:
+            if f.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+                raise ValueError(f"{self.path} is not a LOBSTER order recording")
+            size = ORDER_RECORD.size
+            while True:
+                data = f.read(size * self.chunk)
+                usable = len(data) - len(data) % size
+                if not usable:
+                    return
+                for offset_ns, quantity, price, side in ORDER_RECORD.iter_unpack(data[:usable]):
+                    yield offset_ns, side.decode(), quantity, price
+
+    async def play(self, connection: AsyncTCPConnection) -> int:
+        """Send every recorded order, honouring the recorded spacing scaled by speed"""
+        pending: List[Tuple[str, int, int]] = []
+        start = time.perf_counter()
+        for offset_ns, side, quantity, price in self:
+            if self.speed > 0:
+                due_at = start + offset_ns / 1e9 / self.speed
+                delay = due_at - time.perf_counter()
+                if delay > 0:
+                    # everything up to now is due; send it before waiting for the rest
+                    if pending:
+                        self.sent += await connection.send_orders(pending)
+                        pending = []
+                    await asyncio.sleep(delay)
+            pending.append((side, quantity, price))
+            self.volume += quantity
+            if len(pending) >= self.chunk:
+                self.sent += await connection.send_orders(pending)
+                pending = []
+            if not connection.is_connected:
+                break
+        if pending:
+            self.sent += await connection.send_orders(pending)
+        return self.sent
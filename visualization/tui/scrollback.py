@@ -0,0 +1,119 @@
+import mmap
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+
+DEFAULT_TAPE_LINES = 2000
+SCROLLBACK_PAGE_LINES = 200
+
+
+class Scrollback:
+    """Append-only plain-text history of a log panel, read back through mmap
+
+    The panel pushes every line it shows; the last `max_lines` are mirrored in
+    memory (they are still on screen) and only the ones the cap evicts reach
+    the file. History in a caller-chosen `directory` is kept on close, with the
+    on-screen tail appended so the file holds the whole session; the default
+    temp file is deleted.
+    """
+
+    def __init__(self, name: str, directory: Optional[str] = None, max_lines: int = DEFAULT_TAPE_LINES):
+        self.keep = directory is not None
+        directory = directory or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.name = name
+        self.path = os.path.join(directory, f"lobster-{name}-{stamp}-{os.getpid()}.log")
+        self._file = open(self.path, "ab", buffering=1 << 16)
+        self._recent: deque[str] = deque()
+        self.max_lines = max_lines
+        self.line_count = 0
+
+    @property
+    def recent(self) -> List[str]:
+        """Lines still on screen, oldest first"""
+        return list(self._recent)
+
+    def push(self, lines: Iterable[str]):
+        """Record lines written to the panel; spill whatever the cap pushes off screen"""
+        self._recent.extend(lines)
+        overflow = len(self._recent) - self.max_lines
+        if overflow > 0:
+            popleft = self._recent.popleft
+            self.append([popleft() for _ in range(overflow)])
+
+    def append(self, lines: List[str]):
+        if not lines:
+            return
+        self._file.write(("\n".join(lines) + "\n").encode())
+        self.line_count += len(lines)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.keep:
+            self.append(list(self._recent))
+            self._recent.clear()
+        self._file.close()
+        if not self.keep:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _map(self) -> Optional[mmap.mmap]:
+        self._file.flush()
+        if os.path.getsize(self.path) == 0:
+            return None
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def page(self, end: Optional[int] = None, count: int = 100) -> Tuple[List[str], int]:
+        """Up to `count` lines ending at byte offset `end` (default: end of file)
+
+        Returns the lines oldest-first and the offset to pass for the page before.
+        """
+        mm = self._map()
+        if mm is None:
+            return [], 0
+        with mm:
+            end = len(mm) if end is None else min(end, len(mm))
+            start = end
+            # step over the newline that terminates the last line
+            cursor = end - 1
+            for _ in range(count):
+                if cursor <= 0:
+                    start = 0
+                    break
+                nl = mm.rfind(b"\n", 0, cursor)
+                start = nl + 1
+                cursor = nl
+                if nl < 0:
+                    start = 0
+                    break
+            lines = mm[start:end].decode(errors="replace").splitlines()
+        return lines, start
+
+    def search(self, needle: str, limit: int = 100) -> List[Tuple[int, str]]:
+        """Most recent lines containing `needle`, newest first, as (byte offset, line)"""
+        mm = self._map()
+        if mm is None:
+            return []
+        results = []
+        pattern = needle.encode()
+        with mm:
+            end = len(mm)
+            while len(results) < limit:
+                hit = mm.rfind(pattern, 0, end)
+                if hit < 0:
+                    break
+                line_start = mm.rfind(b"\n", 0, hit) + 1
+                line_end = mm.find(b"\n", hit)
+                if line_end < 0:
+                    line_end = len(mm)
+                results.append((line_start, mm[line_start:line_end].decode(errors="replace")))
+                end = line_start
+        return results
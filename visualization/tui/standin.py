@@ -0,0 +1,414 @@
+import asyncio
+import random
+import socket
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .connection import BINARY_ACCEPT, BINARY_HELLO, FRAME
+from .tracker import BUY, SELL
+
+
+# Server.cpp drops a client whose unterminated line grows past this
+MAX_LINE = 1024
+# commands queued behind the throughput cap before we stop reading sockets
+QUEUE_HIGH = 65536
+QUEUE_LOW = 16384
+
+
+class MatchingBook:
+    """Price-time priority book with the semantics of OrderBook.h
+
+    Orders rest in per-price FIFOs; a new order is added first and then the
+    book is matched until it no longer crosses, each trade printing at the
+    ask's price. Cancelled orders are zeroed in place and skipped when they
+    reach the front of their level.
+    """
+
+    def __init__(self):
+        self.next_id = 0
+        # id -> [id, side, price, remaining]
+        self._orders: Dict[int, list] = {}
+        self._levels: Dict[str, Dict[int, deque]] = {BUY: {}, SELL: {}}
+        self._live: Dict[str, Dict[int, int]] = {BUY: {}, SELL: {}}
+        # ascending active prices per side; best bid is the last, best ask the first
+        self._prices: Dict[str, List[int]] = {BUY: [], SELL: []}
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def add(self, side: str, quantity: int, price: int, trades: List[Tuple[int, int]]) -> int:
+        """Rest an order, match the book and append (price, quantity) trades; the new order id"""
+        self.next_id += 1
+        order_id = self.next_id
+        order = [order_id, side, price, quantity]
+        self._orders[order_id] = order
+        level = self._levels[side].get(price)
+        if level is None:
+            level = self._levels[side][price] = deque()
+            self._live[side][price] = 0
+            insort(self._prices[side], price)
+        level.append(order)
+        self._live[side][price] += 1
+        self._match(trades)
+        return order_id
+
+    def cancel(self, order_id: int) -> bool:
+        order = self._orders.get(order_id)
+        if order is None:
+            return False
+        self._remove(order)
+        return True
+
+    def best_bid(self) -> Optional[int]:
+        prices = self._prices[BUY]
+        return prices[-1] if prices else None
+
+    def best_ask(self) -> Optional[int]:
+        prices = self._prices[SELL]
+        return prices[0] if prices else None
+
+    def _front(self, side: str, price: int) -> list:
+        level = self._levels[side][price]
+        while not level[0][3]:
+            level.popleft()
+        return level[0]
+
+    def _remove(self, order: list):
+        del self._orders[order[0]]
+        order[3] = 0
+        side, price = order[1], order[2]
+        live = self._live[side]
+        live[price] -= 1
+        if not live[price]:
+            del live[price]
+            del self._levels[side][price]
+            prices = self._prices[side]
+            del prices[bisect_left(prices, price)]
+
+    def _match(self, trades: List[Tuple[int, int]]):
+        bids, asks = self._prices[BUY], self._prices[SELL]
+        while bids and asks:
+            bid_price, ask_price = bids[-1], asks[0]
+            if bid_price < ask_price:
+                return
+            bid = self._front(BUY, bid_price)
+            ask = self._front(SELL, ask_price)
+            quantity = min(bid[3], ask[3])
+            trades.append((ask_price, quantity))
+            bid[3] -= quantity
+            ask[3] -= quantity
+            if not bid[3]:
+                self._remove(bid)
+            if not ask[3]:
+                self._remove(ask)
+
+
+@dataclass
+class StandInConfig:
+    host: str = "127.0.0.1"
+    port: int = 54321
+    # seconds added before every reply is written
+    latency: float = 0.0
+    # extra uniform random delay on top of latency, in seconds
+    jitter: float = 0.0
+    # commands matched per second across all clients; 0 is unlimited
+    max_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+def _uint32(token: str) -> int:
+    """Lenient unsigned parse; anything that is not a valid uint32 counts as 0 (rejected)"""
+    try:
+        value = int(token)
+    except ValueError:
+        return 0
+    return value if 0 < value <= 0xFFFFFFFF else 0
+
+
+class _Session(asyncio.Protocol):
+    """One client socket; the equivalent of Server.cpp's clientHandler thread"""
+
+    def __init__(self, server: "StandInServer"):
+        self.server = server
+        self.transport: Optional[asyncio.Transport] = None
+        self._rx = bytearray()
+        self._last_due = 0.0
+        self._delayed: deque = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.paused = False
+        self.binary = False
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.sessions.add(self)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.server.sessions.discard(self)
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def data_received(self, data: bytes):
+        rx = self._rx
+        rx += data
+        if self.binary:
+            self._frames_received()
+            return
+        hello = rx.find(BINARY_HELLO)
+        if hello >= 0 and (hello == 0 or rx[hello - 1] == 0x0A):
+            # lines before the hello stay text; everything after it is frames
+            lines = rx[:hello].decode(errors="replace").split("\n")[:-1]
+            lines.append(BINARY_HELLO.decode().strip())
+            del rx[:hello + len(BINARY_HELLO)]
+            self.binary = True
+            self.server.submit(self, lines)
+            self._frames_received()
+            return
+        end = rx.rfind(b"\n")
+        if end < 0:
+            if len(rx) > MAX_LINE:
+                self.transport.close()
+            return
+        lines = rx[:end].decode(errors="replace").split("\n")
+        del rx[:end + 1]
+        if len(rx) > MAX_LINE:
+            self.transport.close()
+        self.server.submit(self, lines)
+
+    def _frames_received(self):
+        rx = self._rx
+        end = len(rx) - len(rx) % FRAME.size
+        if not end:
+            return
+        frames = list(FRAME.iter_unpack(rx[:end]))
+        del rx[:end]
+        self.server.submit(self, frames)
+
+    def reply(self, payload: bytes):
+        if self.transport.is_closing():
+            return
+        server = self.server
+        if not server.delayed:
+            self.transport.write(payload)
+            return
+        loop = server.loop
+        due = loop.time() + server.config.latency
+        if server.config.jitter:
+            due += server.rng.uniform(0.0, server.config.jitter)
+        # TCP never reorders, so a reply cannot overtake the previous one
+        due = max(due, self._last_due)
+        self._last_due = due
+        self._delayed.append((due, payload))
+        if self._timer is None:
+            self._timer = loop.call_at(due, self._release)
+
+    def _release(self):
+        # one timer per session walking a FIFO; the loop's timer heap does not keep ties in order
+        self._timer = None
+        delayed = self._delayed
+        now = self.server.loop.time()
+        out = []
+        while delayed and delayed[0][0] <= now:
+            out.append(delayed.popleft()[1])
+        if out and not self.transport.is_closing():
+            self.transport.write(b"".join(out))
+        if delayed:
+            self._timer = self.server.loop.call_at(delayed[0][0], self._release)
+
+
+class StandInServer:
+    """asyncio stand-in for Server.cpp speaking the same text and binary protocols
+
+    Commands from every client match against one shared MatchingBook, and
+    trades are reported only to the aggressor, as in OrderHandler.h. Replies
+    can be delayed by a fixed latency plus jitter, and matching can be capped
+    at a command rate; when the backlog behind the cap grows, sockets stop
+    being read so clients feel real backpressure.
+    """
+
+    def __init__(self, config: StandInConfig):
+        self.config = config
+        self.book = MatchingBook()
+        self.rng = random.Random(config.seed)
+        self.delayed = config.latency > 0 or config.jitter > 0
+        self.sessions: set = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._queue: deque = deque()
+        self._wake = asyncio.Event()
+        self._matcher: Optional[asyncio.Task] = None
+        self.commands = 0
+        self.acks = 0
+        self.trades = 0
+        self.cancels = 0
+        self.rejects = 0
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._server = await self.loop.create_server(
+            lambda: _Session(self), self.config.host, self.config.port, reuse_address=True
+        )
+        if self.config.max_rate > 0:
+            self._matcher = asyncio.create_task(self._match_loop())
+
+    @property
+    def port(self) -> int:
+        """Bound port, useful when started on port 0"""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def stop(self):
+        if self._matcher:
+            self._matcher.cancel()
+            try:
+                await self._matcher
+            except asyncio.CancelledError:
+                pass
+        self._server.close()
+        for session in list(self.sessions):
+            session.transport.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def submit(self, session: _Session, commands: list):
+        """Text lines, or (type, quantity, price, order id) tuples from binary frames"""
+        if self._matcher is None:
+            out: List[bytes] = []
+            self._execute(commands, out)
+            session.reply(b"".join(out))
+            return
+        queue = self._queue
+        queue.extend((session, command) for command in commands)
+        self._wake.set()
+        if len(queue) > QUEUE_HIGH and not session.paused:
+            session.paused = True
+            session.transport.pause_reading()
+
+    def _execute(self, commands: Iterable, out: List[bytes]):
+        """Run commands as handleClientCommand does, appending the bytes to send back"""
+        book = self.book
+        for line in commands:
+            self.commands += 1
+            if type(line) is tuple:
+                self._execute_frame(line, out)
+                continue
+            parts = line.split()
+            kind = parts[0] if parts else ""
+            if kind == "B" or kind == "S":
+                quantity = _uint32(parts[1]) if len(parts) > 1 else 0
+                price = _uint32(parts[2]) if len(parts) > 2 else 0
+                if quantity and price:
+                    trades: List[Tuple[int, int]] = []
+                    order_id = book.add(BUY if kind == "B" else SELL, quantity, price, trades)
+                    out.append(b"Order %d placed.\n" % order_id)
+                    for trade_price, trade_quantity in trades:
+                        out.append(b"Trade Executed: %d x %d\n" % (trade_price, trade_quantity))
+                    self.acks += 1
+                    self.trades += len(trades)
+                    continue
+            elif kind == "BIN" and parts[1:] == ["1"]:
+                out.append(BINARY_ACCEPT + b"\n")
+                continue
+            elif kind == "C":
+                order_id = _uint32(parts[1]) if len(parts) > 1 else 0
+                if order_id:
+                    # the C++ server confirms a cancel whether or not the id was resting
+                    book.cancel(order_id)
+                    out.append(b"Order %d canceled.\n" % order_id)
+                    self.cancels += 1
+                    continue
+            # sent without a newline, exactly as OrderHandler.h does
+            out.append(b"Invalid Order")
+            self.rejects += 1
+
+    def _execute_frame(self, frame: Tuple[bytes, int, int, int], out: List[bytes]):
+        """handleBinaryCommand: the same book operations with frame replies"""
+        kind, quantity, price, order_id = frame
+        pack = FRAME.pack
+        if (kind == b"B" or kind == b"S") and quantity and price:
+            trades: List[Tuple[int, int]] = []
+            order_id = self.book.add(BUY if kind == b"B" else SELL, quantity, price, trades)
+            out.append(pack(b"A", 0, 0, order_id))
+            for trade_price, trade_quantity in trades:
+                out.append(pack(b"T", trade_quantity, trade_price, 0))
+            self.acks += 1
+            self.trades += len(trades)
+        elif kind == b"C" and order_id:
+            self.book.cancel(order_id)
+            out.append(pack(b"X", 0, 0, order_id))
+            self.cancels += 1
+        else:
+            out.append(pack(b"R", 0, 0, 0))
+            self.rejects += 1
+
+    async def _match_loop(self):
+        queue = self._queue
+        interval = 1.0 / self.config.max_rate
+        next_slot = time.perf_counter()
+        while True:
+            if not queue:
+                self._wake.clear()
+                await self._wake.wait()
+                next_slot = max(next_slot, time.perf_counter())
+            now = time.perf_counter()
+            if next_slot > now:
+                await asyncio.sleep(next_slot - now)
+                now = time.perf_counter()
+            # match everything whose slot has come up in arrival order, one reply per session
+            due = min(len(queue), int((now - next_slot) / interval) + 1)
+            next_slot += due * interval
+            replies: Dict[_Session, List[bytes]] = {}
+            for _ in range(due):
+                session, command = queue.popleft()
+                out = replies.get(session)
+                if out is None:
+                    out = replies[session] = []
+                self._execute((command,), out)
+            for session, out in replies.items():
+                session.reply(b"".join(out))
+            if len(queue) < QUEUE_LOW:
+                for session in self.sessions:
+                    if session.paused:
+                        session.paused = False
+                        session.transport.resume_reading()
+
+
+async def serve(config: StandInConfig):
+    async with StandInServer(config) as server:
+        print(f"Listening on port {server.port} ...")
+        await server.serve_forever()
+
+
+def run_standin(
+    host: str = "127.0.0.1",
+    port: int = 54321,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    max_rate: float = 0.0,
+    seed: Optional[int] = None
+) -> int:
+    config = StandInConfig(
+        host=host, port=port, latency=latency, jitter=jitter, max_rate=max_rate, seed=seed
+    )
+    try:
+        asyncio.run(serve(config))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"bind: {e}")
+        return 1
+    return 0
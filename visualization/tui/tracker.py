@@ -0,0 +1,183 @@
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from .connection import AckEvent, CancelEvent, RejectEvent, ServerEvent, TradeEvent
+
+
+BUY = "B"
+SELL = "S"
+
+
+@dataclass(slots=True, eq=False)
+class TrackedOrder:
+    order_id: int
+    side: str
+    price: int
+    quantity: int
+    remaining: int
+    prev: Optional["TrackedOrder"] = field(default=None, repr=False)
+    next: Optional["TrackedOrder"] = field(default=None, repr=False)
+
+
+@dataclass(slots=True, eq=False)
+class PriceLevel:
+    """FIFO of resting orders at one price, as a doubly linked list"""
+    price: int
+    head: Optional[TrackedOrder] = None
+    tail: Optional[TrackedOrder] = None
+    quantity: int = 0
+    count: int = 0
+
+    def append(self, order: TrackedOrder):
+        order.prev = self.tail
+        order.next = None
+        if self.tail:
+            self.tail.next = order
+        else:
+            self.head = order
+        self.tail = order
+        self.quantity += order.remaining
+        self.count += 1
+
+    def unlink(self, order: TrackedOrder):
+        if order.prev:
+            order.prev.next = order.next
+        else:
+            self.head = order.next
+        if order.next:
+            order.next.prev = order.prev
+        else:
+            self.tail = order.prev
+        order.prev = order.next = None
+        self.quantity -= order.remaining
+        self.count -= 1
+
+
+class OrderTracker:
+    """Client-side view of our own resting orders, mirroring OrderBook.h
+
+    Acks are paired with sends in FIFO order to learn each order's id. A trade
+    reported after an ack is the acked order crossing the book, so it fills
+    that order and the front of the best opposite level, as OrderBook::match
+    does. Fills are exact as long as this client owns every resting order.
+    """
+
+    def __init__(self):
+        self._unacked: deque = deque()
+        self._orders: Dict[int, TrackedOrder] = {}
+        self._levels: Dict[str, Dict[int, PriceLevel]] = {BUY: {}, SELL: {}}
+        # ascending active prices per side; best bid is the last, best ask the first
+        self._prices: Dict[str, List[int]] = {BUY: [], SELL: []}
+        self._aggressor: Optional[TrackedOrder] = None
+        self._dirty: Set[Tuple[str, int]] = set()
+        self.filled_quantity = 0
+
+    def on_sent(self, side: str, quantity: int, price: int):
+        self._unacked.append((side, quantity, price))
+
+    def on_events(self, events: List[ServerEvent]):
+        for event in events:
+            kind = type(event)
+            if kind is AckEvent:
+                self._on_ack(event.order_id)
+            elif kind is TradeEvent:
+                self._on_trade(event.quantity)
+            elif kind is CancelEvent:
+                self.remove(event.order_id)
+            elif kind is RejectEvent:
+                if self._unacked:
+                    self._unacked.popleft()
+
+    def _on_ack(self, order_id: int):
+        if not self._unacked:
+            self._aggressor = None
+            return
+        side, quantity, price = self._unacked.popleft()
+        order = TrackedOrder(order_id, side, price, quantity, quantity)
+        self._orders[order_id] = order
+        level = self._levels[side].get(price)
+        if level is None:
+            level = self._levels[side][price] = PriceLevel(price)
+            insort(self._prices[side], price)
+        level.append(order)
+        self._dirty.add((side, price))
+        self._aggressor = order
+
+    def _on_trade(self, quantity: int):
+        aggressor = self._aggressor
+        if aggressor is None:
+            return
+        self._fill(aggressor, quantity)
+        opposite = SELL if aggressor.side == BUY else BUY
+        best = self.best_price(opposite)
+        if best is not None:
+            resting = self._levels[opposite][best].head
+            if resting is not None:
+                self._fill(resting, quantity)
+
+    def _fill(self, order: TrackedOrder, quantity: int):
+        quantity = min(quantity, order.remaining)
+        self.filled_quantity += quantity
+        if quantity >= order.remaining:
+            self.remove(order.order_id)
+            return
+        order.remaining -= quantity
+        self._levels[order.side][order.price].quantity -= quantity
+        self._dirty.add((order.side, order.price))
+
+    def remove(self, order_id: int) -> Optional[TrackedOrder]:
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return None
+        levels = self._levels[order.side]
+        level = levels[order.price]
+        level.unlink(order)
+        if level.count == 0:
+            del levels[order.price]
+            prices = self._prices[order.side]
+            del prices[bisect_left(prices, order.price)]
+        self._dirty.add((order.side, order.price))
+        if order is self._aggressor:
+            self._aggressor = None
+        return order
+
+    def get(self, order_id: int) -> Optional[TrackedOrder]:
+        return self._orders.get(order_id)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._orders
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def best_price(self, side: str) -> Optional[int]:
+        prices = self._prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == BUY else prices[0]
+
+    def level(self, side: str, price: int) -> Optional[PriceLevel]:
+        return self._levels[side].get(price)
+
+    def depth(self, side: str, levels: int = 10) -> List[Tuple[int, int, int]]:
+        """(price, quantity, order count) from the best price outwards"""
+        prices = self._prices[side]
+        ordered = reversed(prices) if side == BUY else iter(prices)
+        book = self._levels[side]
+        result = []
+        for price in ordered:
+            level = book[price]
+            result.append((price, level.quantity, level.count))
+            if len(result) == levels:
+                break
+        return result
+
+    def pop_dirty(self) -> Set[Tuple[str, int]]:
+        """(side, price) levels that changed since the last call"""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def reset(self):
+        self.__init__()
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from typing import Optional
+
+from .connection import (
+    FRAME,
+    PROTOCOL,
+    READ_CHUNK,
+    RECEIVED,
+    STREAMS,
+    AsyncTCPConnection,
+    ConnectionState,
+    ServerConfig,
+    decode_frames,
+)
+from .lazy import lazy_import
+
+# optional: faster event loop for the protocol transport
+uvloop = lazy_import("uvloop")
+
+
+class ProtocolTCPConnection(AsyncTCPConnection, asyncio.BufferedProtocol):
+    """AsyncTCPConnection driven straight from asyncio.BufferedProtocol callbacks
+
+    The event loop receives into one preallocated buffer and calls back
+    synchronously, so there is no StreamReader copy, no receive task and no
+    coroutine hop per chunk. Writes go to the transport directly and only
+    block when the transport asks us to pause.
+    """
+
+    def __init__(self, config: ServerConfig):
+        super().__init__(config)
+        self.writer: Optional[asyncio.WriteTransport] = None
+        self._rbuf = bytearray(READ_CHUNK * 2)
+        self._rview = memoryview(self._rbuf)
+        self._rlen = 0
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+        self._closed = asyncio.Event()
+
+    async def _open_transport(self):
+        self._rlen = 0
+        self._can_write.set()
+        self._closed.clear()
+        loop = asyncio.get_running_loop()
+        await loop.create_connection(lambda: self, self.config.host, self.config.port)
+
+    def _start_receiving(self):
+        pass
+
+    async def _close_transport(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        try:
+            await asyncio.wait_for(self._closed.wait(), 1.0)
+        except asyncio.TimeoutError:
+            self.writer.abort()
+        self.writer = None
+
+    async def _drain(self):
+        if not self._can_write.is_set():
+            await self._can_write.wait()
+        if self._closed.is_set():
+            raise ConnectionResetError("Connection lost")
+
+    def _write_transport(self) -> asyncio.WriteTransport:
+        return self.writer
+
+    def _write_paused(self) -> bool:
+        return not self._can_write.is_set() or self._closed.is_set()
+
+    # asyncio.BufferedProtocol
+
+    def connection_made(self, transport: asyncio.BaseTransport):
+        self.writer = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if len(self._rbuf) - self._rlen < READ_CHUNK:
+            # only a partial line is ever carried over, so this is rare
+            grown = bytearray(max(len(self._rbuf) * 2, self._rlen + READ_CHUNK))
+            grown[:self._rlen] = self._rview[:self._rlen]
+            self._rbuf = grown
+            self._rview = memoryview(grown)
+        return self._rview[self._rlen:]
+
+    def buffer_updated(self, nbytes: int):
+        started = time.perf_counter_ns()
+        self._receive_buffered(nbytes)
+        self.receive_time.record(time.perf_counter_ns() - started)
+
+    def _receive_buffered(self, nbytes: int):
+        self.bytes_received += nbytes
+        start = self._rlen
+        filled = self._rlen = start + nbytes
+        view = self._rview
+        if self.journal:
+            self.journal.record(RECEIVED, bytes(view[start:filled]))
+        if self._negotiating:
+            data = self._negotiate(bytes(view[start:filled]))
+            view[:len(data)] = data
+            start, filled = 0, len(data)
+            self._rlen = filled
+            if not data:
+                return
+        if self.binary:
+            end = filled - filled % FRAME.size
+            if not end:
+                return
+            events = decode_frames(view[:end])
+            rest = filled - end
+            if rest:
+                view[:rest] = bytes(view[end:filled])
+            self._rlen = rest
+            self._dispatch_events(events)
+            return
+        # the carried-over bytes hold no newline, so only the new ones need searching
+        end = self._rbuf.rfind(b"\n", start, filled)
+        if end < 0:
+            return
+        text = str(view[:end], "utf-8")
+        rest = filled - end - 1
+        if rest:
+            view[:rest] = bytes(view[end + 1:filled])
+        self._rlen = rest
+        lines = [line for line in map(str.strip, text.split("\n")) if line]
+        if lines:
+            self._dispatch(lines)
+
+    def eof_received(self) -> bool:
+        return False
+
+    def pause_writing(self):
+        self._can_write.clear()
+
+    def resume_writing(self):
+        self._can_write.set()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self._closed.set()
+        self._can_write.set()
+        self._window_open.set()
+        if self.is_connected:
+            self._set_state(ConnectionState.ERROR if exc else ConnectionState.DISCONNECTED)
+
+
+def create_connection(config: ServerConfig) -> AsyncTCPConnection:
+    """Connection for config.transport"""
+    if config.transport == PROTOCOL:
+        return ProtocolTCPConnection(config)
+    if config.transport == STREAMS:
+        return AsyncTCPConnection(config)
+    raise ValueError(f"unknown transport: {config.transport}")
+
+
+def install_uvloop() -> bool:
+    """Make uvloop the event loop policy if it is installed; call before the loop starts"""
+    if uvloop is None:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def event_loop_name() -> str:
+    policy = asyncio.get_event_loop_policy()
+    return "uvloop" if uvloop is not None and isinstance(policy, uvloop.EventLoopPolicy) else "asyncio"
@@ -1,7 +1,20 @@
-from textual.widgets import Static, RichLog
+import time
+
+from textual.binding import Binding
+from textual.screen import ModalScreen
+from textual.widgets import Static, RichLog, DataTable, Input
 from textual.containers import Container, Vertical
 from rich.text import Text
 
+from .analytics import WindowStats
+from .connection import (
+    AckEvent, TradeEvent, CancelEvent, RejectEvent, NoticeEvent, ServerEvent, FlowStats
+)
+from .generator import GeneratedOrder
+from .latency import LatencyHistogram, format_ns
+from .scrollback import DEFAULT_TAPE_LINES, Scrollback, SCROLLBACK_PAGE_LINES
+from .tracker import BUY, SELL, OrderTracker
+
 
 class HeaderWidget(Static):
     """Top header bar with connection status"""
@@ -72,16 +85,46 @@ class AlgoPanel(Vertical):
     }
     """
 
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_TAPE_LINES,
+        scrollback: Scrollback | None = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.max_lines = max_lines
+        self.scrollback = scrollback
+
     def compose(self):
         yield Static("ORDERS")
-        yield RichLog(id="algo-log", highlight=True, markup=True)
+        yield RichLog(id="algo-log", highlight=True, markup=True, max_lines=self.max_lines)
 
     def log_order(self, side: str, quantity: int, price: int):
-        log = self.query_one("#algo-log", RichLog)
+        self._write([self.format_order(side, quantity, price)])
+
+    def log_orders(self, orders: list[GeneratedOrder], summary: str | None = None):
+        """Write a whole frame of orders in one batch"""
+        lines = []
+        if summary:
+            lines.append(Text(f">> {summary}", style="dim"))
+        lines.extend(
+            self.format_order(order.side_str, order.quantity, order.price)
+            for order in orders
+        )
+        self._write(lines)
+
+    def _write(self, lines: list[Text]):
+        if not lines:
+            return
+        self.query_one("#algo-log", RichLog).write(Text("\n").join(lines))
+        if self.scrollback:
+            self.scrollback.push(line.plain for line in lines)
+
+    @staticmethod
+    def format_order(side: str, quantity: int, price: int) -> Text:
         if side == "BUY":
-            log.write(Text(f">> SENT: BUY {quantity} @ {price}", style="bold green"))
-        else:
-            log.write(Text(f">> SENT: SELL {quantity} @ {price}", style="bold red"))
+            return Text(f">> SENT: BUY {quantity} @ {price}", style="bold green")
+        return Text(f">> SENT: SELL {quantity} @ {price}", style="bold red")
 
 
 class TapePanel(Vertical):
@@ -110,25 +153,139 @@ class TapePanel(Vertical):
     }
     """
 
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_TAPE_LINES,
+        scrollback: Scrollback | None = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.max_lines = max_lines
+        self.scrollback = scrollback
+
     def compose(self):
         yield Static("EXCHANGE TAPE")
-        yield RichLog(id="tape-log", highlight=True, markup=True)
+        yield RichLog(id="tape-log", highlight=True, markup=True, max_lines=self.max_lines)
 
-    def log_message(self, message: str):
-        log = self.query_one("#tape-log", RichLog)
-        
-        if "Trade" in message or "MATCH" in message or "Executed" in message:
+    def log_events(self, events: list[ServerEvent], summary: str | None = None):
+        """Write a whole frame of events in one batch"""
+        lines = []
+        if summary:
+            lines.append(Text(f"    [...] {summary}", style="bold bright_yellow"))
+        lines.extend(self.format_event(event) for event in events)
+        if not lines:
+            return
+        self.query_one("#tape-log", RichLog).write(Text("\n").join(lines))
+        if self.scrollback:
+            self.scrollback.push(line.plain for line in lines)
+
+    @staticmethod
+    def format_event(event: ServerEvent) -> Text:
+        kind = type(event)
+        if kind is TradeEvent:
             text = Text()
-            # text.append("", style="") 
             text.append("[EXEC] ", style="bold bright_yellow")
-            text.append(message, style="bold bright_green on #1a3d1a")
-            log.write(text)
-        elif "placed" in message or "Accepted" in message:
-            log.write(Text(f"    [ACK] {message}", style="dim"))
-        elif "canceled" in message:
-            log.write(Text(f"    [CXL] {message}", style="yellow"))
-        else:
-            log.write(Text(f"    [MSG] {message}", style="white"))
+            text.append(
+                f"Trade Executed: {event.price} x {event.quantity}",
+                style="bold bright_green on #1a3d1a"
+            )
+            return text
+        if kind is AckEvent:
+            return Text(f"    [ACK] Order {event.order_id} placed.", style="dim")
+        if kind is CancelEvent:
+            return Text(f"    [CXL] Order {event.order_id} canceled.", style="yellow")
+        if kind is RejectEvent:
+            return Text(f"    [REJ] {event.reason}", style="bold red")
+        return Text(f"    [MSG] {event.text}", style="white")
+
+
+class DepthPanel(Vertical):
+    """Price ladder of our own resting orders, updated level by level"""
+
+    DEFAULT_CSS = """
+    DepthPanel {
+        width: 34;
+        min-width: 34;
+        height: 100%;
+        border: solid #f7b733;
+        background: #0a0a0f;
+    }
+    
+    DepthPanel > Static {
+        height: 3;
+        padding: 1;
+        background: #1a1a2e;
+        color: #f7b733;
+        text-align: center;
+        text-style: bold;
+    }
+    
+    DepthPanel > DataTable {
+        height: 1fr;
+        background: #0a0a0f;
+    }
+    """
+
+    def __init__(self, low: int = 40, high: int = 160, **kwargs):
+        super().__init__(**kwargs)
+        self.low = low
+        self.high = high
+        # price the ladder is scrolled to
+        self._center: int | None = None
+
+    def compose(self):
+        yield Static("OUR DEPTH")
+        yield DataTable(id="depth-table", show_cursor=False, zebra_stripes=False)
+
+    def on_mount(self):
+        table = self.query_one("#depth-table", DataTable)
+        table.add_column("#", key="bid_count", width=4)
+        table.add_column("BID", key="bid_qty", width=7)
+        table.add_column("PX", key="price", width=4)
+        table.add_column("ASK", key="ask_qty", width=7)
+        table.add_column("#", key="ask_count", width=4)
+        # the ladder is fixed, so updates only ever touch the cells of levels that changed
+        for price in range(self.high, self.low - 1, -1):
+            table.add_row("", "", Text(str(price), style="bold white"), "", "", key=str(price))
+        # until there are orders, show the middle of the ladder rather than its top
+        self.call_after_refresh(self._scroll_to, (self.low + self.high) // 2)
+
+    def apply(self, tracker: OrderTracker, dirty: set[tuple[str, int]]):
+        table = self.query_one("#depth-table", DataTable)
+        for side, price in dirty:
+            if price < self.low or price > self.high:
+                continue
+            level = tracker.level(side, price)
+            if side == BUY:
+                qty_key, count_key, style = "bid_qty", "bid_count", "bold green"
+            else:
+                qty_key, count_key, style = "ask_qty", "ask_count", "bold red"
+            if level is None:
+                qty, count = "", ""
+            else:
+                qty = Text(f"{level.quantity:,}", style=style)
+                count = Text(str(level.count), style="dim")
+            row = str(price)
+            table.update_cell(row, qty_key, qty)
+            table.update_cell(row, count_key, count)
+        self._recenter(tracker)
+
+    def _recenter(self, tracker: OrderTracker):
+        """Keep the touch in view: scroll to the best bid/ask midpoint, or the one side we have"""
+        bid, ask = tracker.best_price(BUY), tracker.best_price(SELL)
+        if bid is None and ask is None:
+            return
+        mid = ask if bid is None else bid if ask is None else (bid + ask) // 2
+        self._scroll_to(max(self.low, min(self.high, mid)))
+
+    def _scroll_to(self, price: int):
+        if price == self._center:
+            return
+        self._center = price
+        table = self.query_one("#depth-table", DataTable)
+        # rows run from high down to low; scroll_to clamps to the populated rows
+        visible = max(1, table.scrollable_content_region.height - 1)
+        table.scroll_to(y=max(0, self.high - price - visible // 2), animate=False)
 
 
 class TelemetryPanel(Vertical):
@@ -169,37 +326,78 @@ class TelemetryPanel(Vertical):
         border: solid #333;
         margin: 1;
     }
+
+    #flow-stats {
+        height: auto;
+        padding: 1;
+        background: #0f0f1a;
+        border: solid #333;
+        margin: 1;
+    }
+
+    #window-stats {
+        height: auto;
+        padding: 1;
+        background: #0f0f1a;
+        border: solid #333;
+        margin: 1;
+    }
     """
 
     def compose(self):
         yield Static("TELEMETRY & SPECS")
         yield Static(id="live-stats")
         yield Static(id="engine-specs")
+        yield Static(id="flow-stats")
+        yield Static(id="window-stats")
 
     def on_mount(self):
+        self._last_flow: tuple[float, int, int] | None = None
         self._update_specs()
         self._update_stats(0, 0, 0.0, "MARKET_MAKING")
 
-    def _update_specs(self):
+    def _update_specs(self, latency: LatencyHistogram | None = None, cancels: LatencyHistogram | None = None):
         specs_widget = self.query_one("#engine-specs", Static)
         
         text = Text()
-        text.append("ENGINE BENCHMARKS\n", style="bold yellow")
+        text.append("ROUND-TRIP LATENCY\n", style="bold yellow")
         text.append("─" * 25 + "\n", style="dim")
-        text.append("Core Latency:  ", style="cyan")
-        text.append("440 ns\n", style="bold green")
-        text.append("Wire Latency:  ", style="cyan")
-        text.append("33 μs\n", style="bold green")
-        text.append("Throughput:    ", style="cyan")
-        text.append("2.2M/s\n", style="bold green")
-        text.append("Concurrency:   ", style="cyan")
-        text.append("Multi-Threaded\n", style="bold green")
-        text.append("Sync:          ", style="cyan")
-        text.append("Mutex-Guarded", style="bold green")
+        if latency is None or latency.count == 0:
+            text.append("Waiting for acks...", style="dim")
+            specs_widget.update(text)
+            return
+
+        p50, p99, p999 = latency.percentiles([0.5, 0.99, 0.999])
+        for label, value in (
+            ("p50:           ", p50),
+            ("p99:           ", p99),
+            ("p99.9:         ", p999),
+            ("max:           ", latency.max_ns),
+        ):
+            text.append(label, style="cyan")
+            text.append(f"{format_ns(value)}\n", style="bold green")
+        text.append("Samples:       ", style="cyan")
+        text.append(f"{latency.count:,}", style="bold green")
+        if cancels is not None and cancels.count:
+            p50, p99 = cancels.percentiles([0.5, 0.99])
+            text.append("\nCancel p50:    ", style="cyan")
+            text.append(f"{format_ns(p50)}\n", style="bold green")
+            text.append("Cancel p99:    ", style="cyan")
+            text.append(f"{format_ns(p99)}\n", style="bold green")
+            text.append("Cancels:       ", style="cyan")
+            text.append(f"{cancels.count:,}", style="bold green")
         
         specs_widget.update(text)
 
-    def _update_stats(self, orders: int, volume: int, rate: float, strategy: str):
+    def _update_stats(
+        self,
+        orders: int,
+        volume: int,
+        rate: float,
+        strategy: str,
+        target: float | None = None,
+        shortfall: float = 0.0
+    ):
         stats_widget = self.query_one("#live-stats", Static)
         
         text = Text()
@@ -211,13 +409,89 @@ class TelemetryPanel(Vertical):
         text.append(f"{volume:,}\n", style="bold bright_green")
         text.append("Rate:          ", style="white")
         text.append(f"{rate:.1f}/s\n", style="bold bright_cyan")
+        if target is not None:
+            text.append("Target:        ", style="white")
+            text.append(f"{target:.0f}/s ", style="bold bright_cyan")
+            short_style = "bold bright_green" if shortfall < 0.05 else "bold red"
+            text.append(f"(-{shortfall:.1%})\n", style=short_style)
         text.append("Strategy:      ", style="white")
         text.append(strategy, style="bold yellow")
         
         stats_widget.update(text)
 
-    def update_live_stats(self, orders: int, volume: int, rate: float, strategy: str):
-        self._update_stats(orders, volume, rate, strategy)
+    def update_live_stats(
+        self,
+        orders: int,
+        volume: int,
+        rate: float,
+        strategy: str,
+        target: float | None = None,
+        shortfall: float = 0.0
+    ):
+        self._update_stats(orders, volume, rate, strategy, target, shortfall)
+
+    def update_latency(self, latency: LatencyHistogram, cancels: LatencyHistogram | None = None):
+        self._update_specs(latency, cancels)
+
+    def update_flow(self, flow: FlowStats, high_water: int):
+        """Queue depth against the high watermark, and the share of time spent blocked"""
+        now = time.monotonic()
+        write_share = window_share = 0.0
+        if self._last_flow is not None:
+            then, write_ns, window_ns = self._last_flow
+            span_ns = (now - then) * 1e9
+            if span_ns > 0:
+                write_share = (flow.write_blocked_ns - write_ns) / span_ns
+                window_share = (flow.window_blocked_ns - window_ns) / span_ns
+        self._last_flow = (now, flow.write_blocked_ns, flow.window_blocked_ns)
+
+        text = Text()
+        text.append("FLOW CONTROL\n", style="bold yellow")
+        text.append("─" * 25 + "\n", style="dim")
+        text.append("Out Queue:     ", style="cyan")
+        queue_style = "bold red" if flow.queued_bytes > high_water else "bold green"
+        text.append(f"{flow.queued_bytes / 1024:.1f} / {high_water // 1024} KiB\n", style=queue_style)
+        text.append("In Flight:     ", style="cyan")
+        text.append(f"{flow.in_flight:,} ({flow.bytes_in_flight / 1024:.1f} KiB)\n", style="bold green")
+        for label, share, pauses in (
+            ("Socket Full:   ", write_share, flow.write_pauses),
+            ("Ack Window:    ", window_share, flow.window_pauses),
+        ):
+            text.append(label, style="cyan")
+            text.append(f"{max(0.0, share):.0%} ", style="bold red" if share > 0.05 else "bold green")
+            text.append(f"({pauses:,} pauses)\n", style="dim")
+        text.rstrip()
+        self.query_one("#flow-stats", Static).update(text)
+
+    def update_analytics(self, windows: dict[str, list[WindowStats]], active: str | None):
+        """Trailing windows for the active strategy, and the longest window of the others"""
+        text = Text()
+        text.append("STRATEGY WINDOWS\n", style="bold yellow")
+        text.append("─" * 25 + "\n", style="dim")
+        current = windows.get(active)
+        if not current:
+            text.append("Waiting for orders...", style="dim")
+            self.query_one("#window-stats", Static).update(text)
+            return
+        text.append(f"{active}\n", style="bold yellow")
+        text.append("     Ord/s  Trd/s   VWAP\n", style="dim")
+        for stats in current:
+            text.append(f"{stats.window:g}s".ljust(4), style="cyan")
+            text.append(
+                f"{stats.rate:>6,.0f} {stats.traded_rate:>6,.0f} {stats.vwap:>6.2f}\n", style="bold green"
+            )
+        text.append("     Fill  Trd/Ord\n", style="dim")
+        for stats in current:
+            text.append(f"{stats.window:g}s".ljust(4), style="cyan")
+            text.append(f"{stats.fill_ratio:>6.1%} {stats.trades_per_order:>6.2f}\n", style="bold green")
+        others = [(name, stats[-1]) for name, stats in windows.items() if name != active]
+        if others:
+            text.append(f"Others ({others[0][1].window:g}s)  Ord/s  Fill\n", style="dim")
+            for name, stats in others:
+                text.append(f"{name[:13]:<14}", style="cyan")
+                text.append(f"{stats.rate:>6,.0f} {stats.fill_ratio:>5.1%}\n", style="bold green")
+        text.rstrip()
+        self.query_one("#window-stats", Static).update(text)
 
 
 class FooterWidget(Static):
@@ -238,12 +512,131 @@ class FooterWidget(Static):
         text = Text()
         text.append("[Q]", style="bold cyan")
         text.append(" Quit  ", style="dim")
-        text.append("[1-3]", style="bold cyan")
+        text.append("[1-5]", style="bold cyan")
         text.append(" Strategy  ", style="dim")
         text.append("[+/-]", style="bold cyan")
         text.append(" Speed  ", style="dim")
         text.append("[SPACE]", style="bold cyan")
         text.append(" Pause/Resume  ", style="dim")
         text.append("[R]", style="bold cyan")
-        text.append(" Reset Stats", style="dim")
+        text.append(" Reset Stats  ", style="dim")
+        text.append("[/]", style="bold cyan")
+        text.append(" History", style="dim")
         self.update(text)
+
+
+class ScrollbackScreen(ModalScreen):
+    """History of the log panels: pages through what spilled off screen, or searches it
+
+    Enter in the input searches the current panel's history and on-screen
+    lines; an empty query goes back to paging.
+    """
+
+    DEFAULT_CSS = """
+    ScrollbackScreen {
+        align: center middle;
+    }
+
+    ScrollbackScreen > Vertical {
+        width: 90%;
+        height: 90%;
+        border: solid #00d9ff;
+        background: #0a0a0f;
+    }
+
+    ScrollbackScreen > Vertical > Static {
+        height: 1;
+        padding: 0 1;
+        background: #1a1a2e;
+        color: #00d9ff;
+        text-style: bold;
+    }
+
+    ScrollbackScreen RichLog {
+        height: 1fr;
+        padding: 0 1;
+    }
+    """
+
+    BINDINGS = [
+        Binding("escape", "dismiss", "Close", show=False),
+        Binding("pageup", "older", "Older", show=False),
+        Binding("pagedown", "newer", "Newer", show=False),
+        Binding("ctrl+t", "switch", "Switch Panel", show=False),
+    ]
+
+    def __init__(self, sources: list[Scrollback], page_lines: int = SCROLLBACK_PAGE_LINES, **kwargs):
+        super().__init__(**kwargs)
+        self.sources = sources
+        self.page_lines = page_lines
+        self._source = 0
+        # end offsets of the pages after the one shown; None is the end of the file
+        self._newer: list[int | None] = []
+        self._end: int | None = None
+        self._start = 0
+
+    def compose(self):
+        with Vertical():
+            yield Static(id="scrollback-title")
+            yield Input(placeholder="search, Enter  |  PgUp/PgDn page  |  Ctrl+T panel  |  Esc close")
+            yield RichLog(id="scrollback-log", markup=False, max_lines=None)
+
+    def on_mount(self):
+        self._show_page()
+
+    @property
+    def scrollback(self) -> Scrollback:
+        return self.sources[self._source]
+
+    def _title(self, detail: str):
+        self.query_one("#scrollback-title", Static).update(
+            f"{self.scrollback.name.upper()} HISTORY  {detail}"
+        )
+
+    def _show_page(self):
+        lines, self._start = self.scrollback.page(self._end, self.page_lines)
+        log = self.query_one("#scrollback-log", RichLog)
+        log.clear()
+        if lines:
+            log.write("\n".join(lines))
+            log.scroll_end(animate=False)
+            detail = f"page {len(self._newer) + 1} from the end"
+        else:
+            detail = f"nothing has scrolled past the last {self.scrollback.max_lines:,} lines on screen"
+        self._title(f"{self.scrollback.line_count:,} lines on disk  |  {detail}")
+
+    def on_input_submitted(self, event: Input.Submitted):
+        needle = event.value
+        if not needle:
+            self._newer.clear()
+            self._end = None
+            self._show_page()
+            return
+        log = self.query_one("#scrollback-log", RichLog)
+        log.clear()
+        # newest first: what is still on screen, then the file
+        hits = [line for line in reversed(self.scrollback.recent) if needle in line]
+        hits.extend(line for _, line in self.scrollback.search(needle, max(0, self.page_lines - len(hits))))
+        hits = hits[:self.page_lines]
+        if hits:
+            log.write("\n".join(hits))
+        self._title(f"{len(hits)} newest matches for {needle!r}")
+
+    def action_older(self):
+        if self._start <= 0:
+            return
+        self._newer.append(self._end)
+        self._end = self._start
+        self._show_page()
+
+    def action_newer(self):
+        if not self._newer:
+            return
+        self._end = self._newer.pop()
+        self._show_page()
+
+    def action_switch(self):
+        self._source = (self._source + 1) % len(self.sources)
+        self._newer.clear()
+        self._end = None
+        self._show_page()